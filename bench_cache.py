@@ -0,0 +1,112 @@
+"""
+快取微基準測試
+比較原本的 LRUCache（OrderedDict + timestamps 兩個 dict，無鎖）
+與目前執行緒安全的 LRUCache / StripedLRUCache
+
+執行方式: python bench_cache.py
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+os.environ.setdefault('PERSISTENT_CACHE_ENABLED', 'false')  # 基準測試不建立 SQLite 檔案
+
+from utils.cache import LRUCache, StripedLRUCache
+
+
+class LegacyLRUCache:
+    """原本的 LRUCache 實作（僅供比較）"""
+
+    def __init__(self, max_size=1000, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache = OrderedDict()
+        self.timestamps = {}
+
+    def get(self, key):
+        if key not in self.cache:
+            return None
+        if time.time() - self.timestamps.get(key, 0) > self.ttl:
+            del self.cache[key]
+            del self.timestamps[key]
+            return None
+        self.cache.move_to_end(key)
+        return self.cache[key]
+
+    def set(self, key, value):
+        if key in self.cache:
+            del self.cache[key]
+        self.cache[key] = value
+        self.timestamps[key] = time.time()
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.max_size:
+            oldest_key = next(iter(self.cache))
+            del self.cache[oldest_key]
+            del self.timestamps[oldest_key]
+
+
+CACHE_SIZE = 1000
+KEY_SPACE = 2000
+OPS = 200000
+READ_RATIO = 0.8
+
+
+def make_ops(seed, n):
+    """產生 (is_read, key) 操作序列，80% 讀取"""
+    rng = random.Random(seed)
+    return [(rng.random() < READ_RATIO, f"msg-{rng.randrange(KEY_SPACE)}|en") for _ in range(n)]
+
+
+def run(cache, ops):
+    hits = 0
+    for is_read, key in ops:
+        if is_read:
+            if cache.get(key) is not None:
+                hits += 1
+        else:
+            cache.set(key, key)
+    return hits
+
+
+def bench_single(name, cache):
+    ops = make_ops(1, OPS)
+    start = time.perf_counter()
+    run(cache, ops)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<22} {OPS / elapsed / 1000:8.1f} k ops/s")
+
+
+def bench_threads(name, cache, num_threads=8):
+    per_thread = OPS // num_threads
+    op_lists = [make_ops(i, per_thread) for i in range(num_threads)]
+    errors = []
+
+    def worker(ops):
+        try:
+            run(cache, ops)
+        except Exception as e:  # 無鎖版本可能在並發下出錯
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(ops,)) for ops in op_lists]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    note = f"（{len(errors)} 個執行緒出錯: {type(errors[0]).__name__}）" if errors else ""
+    print(f"  {name:<22} {per_thread * num_threads / elapsed / 1000:8.1f} k ops/s {note}")
+
+
+if __name__ == '__main__':
+    print(f"單執行緒（{OPS} 次操作，{int(READ_RATIO * 100)}% 讀取）")
+    bench_single("LegacyLRUCache", LegacyLRUCache(CACHE_SIZE))
+    bench_single("LRUCache", LRUCache(CACHE_SIZE))
+    bench_single("StripedLRUCache", StripedLRUCache(CACHE_SIZE))
+
+    print("\n8 個執行緒")
+    bench_threads("LegacyLRUCache", LegacyLRUCache(CACHE_SIZE))
+    bench_threads("LRUCache", LRUCache(CACHE_SIZE))
+    bench_threads("StripedLRUCache", StripedLRUCache(CACHE_SIZE))
@@ -0,0 +1,61 @@
+"""
+快取淘汰策略基準測試（以模擬聊天流量重播）
+比較 LRU 與 W-TinyLFU 的命中率
+
+流量模型：
+- 常用語句（問候、固定回覆）依 Zipf 分布重複出現
+- 不定期有聊天很多的群組連續貼出大量只出現一次的訊息（掃描）
+
+執行方式: python bench_cache_policy.py
+"""
+import os
+import random
+
+os.environ.setdefault('PERSISTENT_CACHE_ENABLED', 'false')  # 基準測試不建立 SQLite 檔案
+
+from utils.cache import LRUCache, TinyLFUCache, StripedLRUCache
+
+PHRASES = 5000  # 常用語句數量
+ZIPF_S = 1.0
+REQUESTS = 100000
+SCAN_PROBABILITY = 0.002  # 每次請求觸發掃描的機率
+SCAN_LENGTH = (200, 600)  # 每次掃描的一次性訊息數量
+
+
+def make_trace(seed=42):
+    """產生請求序列"""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** ZIPF_S) for rank in range(1, PHRASES + 1)]
+    phrases = rng.choices(range(PHRASES), weights=weights, k=REQUESTS)
+    trace = []
+    unique = 0
+    for phrase in phrases:
+        trace.append(f"phrase-{phrase}|zh-TW")
+        if rng.random() < SCAN_PROBABILITY:
+            for _ in range(rng.randint(*SCAN_LENGTH)):
+                trace.append(f"oneoff-{unique}|zh-TW")
+                unique += 1
+    return trace
+
+
+def replay(cache, trace):
+    """重播：未命中時寫入（與 translate_text 相同的用法）"""
+    hits = 0
+    for key in trace:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, key)
+    return hits / len(trace)
+
+
+if __name__ == '__main__':
+    trace = make_trace()
+    scans = sum(1 for key in trace if key.startswith('oneoff-'))
+    print(f"請求數 {len(trace)}（一次性訊息 {scans}，{scans / len(trace):.0%}）\n")
+    print(f"  {'容量':>6}  {'LRU':>8}  {'TinyLFU':>8}  {'Striped TinyLFU':>16}")
+    for capacity in (250, 500, 1000, 2000):
+        lru = replay(LRUCache(max_size=capacity), trace)
+        tinylfu = replay(TinyLFUCache(max_size=capacity), trace)
+        striped = replay(StripedLRUCache(max_size=capacity, policy='tinylfu'), trace)
+        print(f"  {capacity:>6}  {lru:>8.1%}  {tinylfu:>8.1%}  {striped:>16.1%}")
@@ -0,0 +1,66 @@
+"""
+長訊息切塊基準測試（模擬引擎延遲）
+比較整段送出與依句子切塊並行翻譯的延遲隨訊息長度的變化
+
+延遲模型：每次請求固定 80ms + 每字 0.15ms（±10% 抖動），
+大致符合 Google 非官方端點在長文字時的表現；不實際連線
+
+執行方式: python bench_chunking.py
+"""
+import os
+import random
+import time
+
+os.environ.setdefault('PERSISTENT_CACHE_ENABLED', 'false')  # 基準測試不建立 SQLite 檔案
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')  # 不受用戶端限流影響
+
+from services import translation_service
+from translations import google_translator
+from utils.text_chunker import chunk_text
+
+BASE_LATENCY = 0.08  # 每次請求固定延遲（秒）
+PER_CHAR_LATENCY = 0.00015  # 每字延遲（秒）
+LENGTHS = (500, 1000, 2000, 4000, 8000, 16000)
+RUNS = 3
+
+_rng = random.Random(42)
+
+
+def simulated_translate(text, target_lang, source_lang=None):
+    """模擬翻譯引擎：依長度延遲後回傳大寫文字"""
+    latency = (BASE_LATENCY + PER_CHAR_LATENCY * len(text)) * _rng.uniform(0.9, 1.1)
+    time.sleep(latency)
+    return text.upper(), 'success'
+
+
+def make_message(length, seed=1):
+    """產生指定長度、中英混合句子的訊息"""
+    rng = random.Random(seed)
+    sentences = ["今天的會議改到下午三點。", "Please bring the updated report. ", "記得確認報價單！",
+                 "The shipment will arrive tomorrow morning. ", "有問題請直接回覆這則訊息。"]
+    text = ''
+    while len(text) < length:
+        text += rng.choice(sentences)
+    return text[:length].strip()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    google_translator.translate = simulated_translate
+    limit = translation_service.CHUNK_MAX_CHARS
+    engines = translation_service.route_engines('en')
+    print(f"切塊上限 {limit} 字，切塊執行緒 {translation_service.config.CHUNK_WORKERS} 個，每種長度取 {RUNS} 次中位數\n")
+    print(f"  {'長度':>6}  {'區塊數':>6}  {'整段送出':>10}  {'切塊並行':>10}")
+    for length in LENGTHS:
+        text = make_message(length)
+        chunks, _ = chunk_text(text, limit)
+        whole = sorted(timed(translation_service._translate_single, text, 'en', None, engines)
+                       for _ in range(RUNS))[RUNS // 2]
+        chunked = sorted(timed(translation_service._translate_chunked, text, 'en', None, engines)
+                         for _ in range(RUNS))[RUNS // 2]
+        print(f"  {length:>6}  {len(chunks):>6}  {whole:>8.0f}ms  {chunked:>8.0f}ms")
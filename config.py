@@ -30,11 +30,120 @@ GOOGLE_TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
 GOOGLE_TIMEOUT = (1.5, 3)
 # DeepL 翻譯 timeout 設定 (connect_timeout, read_timeout) [已優化]
 DEEPL_TIMEOUT = (2, 5)
+# 自動調整 timeout：依各 (引擎, 語言) 實際延遲分布計算，樣本不足時使用上面的固定值
+ADAPTIVE_TIMEOUT_ENABLED = os.getenv('ADAPTIVE_TIMEOUT_ENABLED', 'True').lower() == 'true'
+ADAPTIVE_TIMEOUT_QUANTILE = 0.99  # read timeout 依據的延遲分位數
+ADAPTIVE_TIMEOUT_MULTIPLIER = 1.5  # 分位數乘上的倍數
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 30  # 至少幾個樣本才自動調整
+# 自動調整的上下限 ((connect_min, connect_max), (read_min, read_max))
+GOOGLE_TIMEOUT_BOUNDS = ((0.5, 3), (1, 6))
+DEEPL_TIMEOUT_BOUNDS = ((0.5, 4), (1.5, 10))
+# Google 的 q 參數經 URL 編碼後超過此長度時改用 POST（避免 URL 過長）
+GOOGLE_POST_THRESHOLD = 2000
+# 長訊息切塊：每個引擎單次請求的字元上限（切塊以鏈中最小的上限為準），切塊以獨立執行緒池並行翻譯
+GOOGLE_MAX_CHARS = 1800
+DEEPL_MAX_CHARS = 5000
+CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', 4))
+# DeepL 批次翻譯（一個請求多個 text）上限
+DEEPL_BATCH_MAX_TEXTS = 50
+DEEPL_BATCH_MAX_BYTES = 120 * 1024  # DeepL 單一請求上限為 128 KiB
 # 翻譯重試次數
 MAX_TRANSLATION_RETRIES = 1  # 單次嘗試，快速失敗以支援 fallback
 
 # ============== 翻譯執行緒限制 ==============
 MAX_CONCURRENT_TRANSLATIONS = 4
+# 長駐翻譯工作執行緒數量（預設沿用 MAX_CONCURRENT_TRANSLATIONS）
+TRANSLATION_WORKERS = int(os.getenv('TRANSLATION_WORKERS', MAX_CONCURRENT_TRANSLATIONS))
+TRANSLATION_QUEUE_SIZE = int(os.getenv('TRANSLATION_QUEUE_SIZE', 200))  # 翻譯佇列上限
+TRANSLATION_QUEUE_MAX_WAIT = 20  # 翻譯工作在佇列中最多等待秒數
+
+# ============== Reply token 期限 ==============
+REPLY_TOKEN_TTL = 60  # LINE reply token 自 webhook 事件發生起的有效時間（秒）
+REPLY_DEADLINE_MARGIN = 2  # 預留給 reply_message 本身的時間（秒）
+MIN_TRANSLATION_BUDGET = 1  # 剩餘時間低於此值就不再呼叫翻譯引擎（秒）
+
+# ============== 多語言並行翻譯 ==============
+# 開啟後同一則訊息的各目標語言會同時翻譯，而不是逐一等待
+TRANSLATION_FANOUT_ENABLED = os.getenv('TRANSLATION_FANOUT_ENABLED', 'True').lower() == 'true'
+TRANSLATION_FANOUT_WORKERS = int(os.getenv('TRANSLATION_FANOUT_WORKERS', 8))  # 共用執行緒池大小
+TRANSLATION_FANOUT_TIMEOUT = 8  # 單則訊息所有語言的整體期限（秒）
+
+# ============== 翻譯引擎路由 ==============
+# 每次翻譯依群組偏好、語言支援、斷路器狀態與最近延遲決定引擎順序
+ENGINE_ORDER = [name.strip() for name in os.getenv('ENGINE_ORDER', 'google,deepl').split(',') if name.strip()]
+ROUTER_SLOW_FACTOR = 2.0  # 第一順位的延遲中位數超過第二順位的幾倍時互換（群組有指定偏好時不換）
+ROUTER_MIN_SAMPLES = 20  # 兩個引擎都至少有幾個延遲樣本才依延遲調整
+STUB_ENGINE_ENABLED = os.getenv('STUB_ENGINE_ENABLED', 'False').lower() == 'true'  # 本機測試用引擎（不連線）
+STUB_ENGINE_LATENCY = float(os.getenv('STUB_ENGINE_LATENCY', 0))  # 模擬延遲（秒）
+
+# ============== 負面快取 ==============
+# 引擎不支援的語言、持續解析失敗的 (引擎, 語言) 與翻譯失敗的文字在 TTL 內直接略過，到期後在背景重試
+NEGATIVE_CACHE_ENABLED = os.getenv('NEGATIVE_CACHE_ENABLED', 'True').lower() == 'true'
+NEGATIVE_CACHE_TTL = 60  # (引擎, 語言) 略過時間（秒）
+NEGATIVE_CACHE_MAX_TTL = 900  # 背景重試仍失敗時 TTL 加倍的上限（秒）
+NEGATIVE_CACHE_FAILURES = 3  # (引擎, 語言) 連續幾次解析錯誤才略過（不支援的語言立即略過）
+NEGATIVE_TEXT_CACHE_TTL = 300  # 特定文字在某引擎翻譯失敗後略過的時間（秒）
+NEGATIVE_TEXT_CACHE_SIZE = 1000  # 最多記錄幾段失敗的文字
+
+# ============== 翻譯引擎斷路器 ==============
+# 引擎在時間窗內錯誤率或慢呼叫比例過高時暫停使用，背景探測恢復後再逐步放行
+CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'True').lower() == 'true'
+CIRCUIT_WINDOW_SECONDS = 60  # 滾動時間窗（秒）
+CIRCUIT_MIN_CALLS = 10  # 時間窗內至少幾次呼叫才判斷
+CIRCUIT_ERROR_RATE = 0.5  # 錯誤率達到此值時斷開
+CIRCUIT_SLOW_CALL_SECONDS = 2.5  # 超過此秒數視為慢呼叫
+CIRCUIT_SLOW_RATE = 0.8  # 慢呼叫比例達到此值時斷開
+CIRCUIT_OPEN_SECONDS = 30  # 斷開後每隔多久探測一次（秒）
+CIRCUIT_HALF_OPEN_CALLS = 3  # 探測成功後試行的請求數
+
+# ============== 微批次 ==============
+# 相同語言（與來源語言、引擎順序）同時進行的翻譯超過 MICROBATCH_MIN_INFLIGHT 時，把單行訊息合併成一次批次請求
+MICROBATCH_ENABLED = os.getenv('MICROBATCH_ENABLED', 'True').lower() == 'true'
+MICROBATCH_WINDOW = 0.05  # 最長收集時間（秒），依相同 key 同時進行的請求數縮放
+MICROBATCH_MAX_ITEMS = 20  # 批次筆數上限
+MICROBATCH_MIN_INFLIGHT = 4  # 相同 key 同時進行的請求數不超過此值時不合併
+
+# ============== 用戶端限流 ==============
+# 每個引擎一個 token bucket：超出預算時短暫等待或直接改用其他引擎，收到 429 時暫時降速
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+GOOGLE_RATE_LIMIT = float(os.getenv('GOOGLE_RATE_LIMIT', 10))  # 每秒請求數
+GOOGLE_RATE_BURST = int(os.getenv('GOOGLE_RATE_BURST', 20))
+DEEPL_RATE_LIMIT = float(os.getenv('DEEPL_RATE_LIMIT', 5))
+DEEPL_RATE_BURST = int(os.getenv('DEEPL_RATE_BURST', 10))
+RATE_LIMIT_MAX_WAIT = 0.2  # token 不足時最多等待秒數，超過則改用其他引擎
+RATE_LIMIT_BACKOFF = 0.5  # 收到 429 時速率乘上的比例
+RATE_LIMIT_MIN_RATE = 0.5  # 降速下限（每秒請求數）
+RATE_LIMIT_COOLDOWN = 30  # 收到 429 後多久開始恢復（秒）
+RATE_LIMIT_RECOVERY = 60  # 從下限恢復到原本速率所需時間（秒）
+
+# ============== 對沖請求 ==============
+# Google 超過其最近延遲的 p90 仍未回應時同時送 DeepL，取先回來的結果（預設關閉）
+HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'False').lower() == 'true'
+HEDGE_BUDGET_RATIO = float(os.getenv('HEDGE_BUDGET_RATIO', 0.1))  # 對沖請求最多佔流量的比例
+HEDGE_QUANTILE = 0.9  # 對沖門檻使用的延遲分位數
+HEDGE_MIN_DELAY = 0.3  # 對沖門檻下限（秒）
+HEDGE_DEFAULT_DELAY = 1.0  # 樣本不足時的對沖門檻（秒）
+HEDGE_MIN_SAMPLES = 20  # 至少幾個延遲樣本才使用分位數
+HEDGE_LATENCY_SAMPLES = 200  # 延遲滾動視窗大小
+HEDGE_MAX_INFLIGHT = 16  # 同時進行的對沖翻譯上限（超過時不對沖）
+
+# ============== 略過不需翻譯的訊息 ==============
+# 純表情、貼圖文字、網址、@提及、笑聲、標點與數字不送翻譯（群組可在 data.json 的 skip_rules 調整）
+SKIP_NON_TRANSLATABLE = os.getenv('SKIP_NON_TRANSLATABLE', 'True').lower() == 'true'
+
+# ============== 佔位符保護 ==============
+# 送出翻譯前以 {n} 取代網址、@提及與表情符號，翻譯後再還原（減少字數，避免引擎改壞）
+PLACEHOLDER_PROTECTION_ENABLED = os.getenv('PLACEHOLDER_PROTECTION_ENABLED', 'True').lower() == 'true'
+
+# ============== 來源語言偵測 ==============
+# 以文字區段判斷訊息語言：略過與原文相同的目標語言，並把來源語言傳給翻譯引擎
+LANG_DETECT_ENABLED = os.getenv('LANG_DETECT_ENABLED', 'True').lower() == 'true'
+LANG_DETECT_MIN_RATIO = 0.6  # 主要文字系統佔所有字母的最低比例，低於此值視為混合語言（不略過）
+
+# ============== 片段快取 ==============
+# 多行訊息拆成片段分別快取，只翻譯快取中沒有的行（轉貼、編輯後重貼的訊息大多數行相同）
+SEGMENT_CACHE_ENABLED = os.getenv('SEGMENT_CACHE_ENABLED', 'True').lower() == 'true'
+SEGMENT_SENTENCE_MIN_CHARS = 200  # 單行超過此長度時再依句子拆分
 
 # ============== 檔案存儲 ==============
 MASTER_USER_FILE = "master_user_ids.json"
@@ -72,7 +181,39 @@ AUTO_RESTART_INTERVAL = 10800  # 自動重啟間隔（秒）
 # ============== 快取設定 ==============
 TRANSLATION_CACHE_TTL = 3600  # 翻譯結果快取時間 (秒)
 TRANSLATION_CACHE_SIZE = 1000  # 翻譯結果快取大小 (記錄數)
+# 翻譯快取淘汰策略：lru 或 tinylfu（頻率感知，避免一次性訊息洗掉常用語句）
+TRANSLATION_CACHE_POLICY = os.getenv('TRANSLATION_CACHE_POLICY', 'tinylfu').lower()
+# 翻譯快取接近滿載時，每個群組 / 有效租戶最多可持有的記錄數（軟性配額）
+CACHE_PARTITION_QUOTA = int(os.getenv('CACHE_PARTITION_QUOTA', TRANSLATION_CACHE_SIZE // 5))
+CACHE_TENANT_PARTITION_QUOTA = int(os.getenv('CACHE_TENANT_PARTITION_QUOTA', TRANSLATION_CACHE_SIZE // 2))
+# 翻譯快取 key 會先正規化（NFKC、合併空白）再取 hash
+TRANSLATION_CACHE_CASEFOLD = os.getenv('TRANSLATION_CACHE_CASEFOLD', 'True').lower() == 'true'  # 英文/俄文忽略大小寫
+TRANSLATION_CACHE_VERIFY = os.getenv('TRANSLATION_CACHE_VERIFY', 'False').lower() == 'true'  # 儲存原文比對，防 hash 碰撞
 GROUP_LANGS_CACHE_TTL = 300  # 群組語言設定快取時間 (秒)
+MENU_CACHE_TTL = 60  # 語言選單快取時間 (秒)
+CACHE_LOCK_STRIPES = 16  # 翻譯、群組設定快取的分段鎖數量
+
+# 各快取的記憶體上限 (bytes，key + value 估計值)，依容器記憶體限制調整
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv('TRANSLATION_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+GROUP_LANGS_CACHE_MAX_BYTES = int(os.getenv('GROUP_LANGS_CACHE_MAX_BYTES', 1024 * 1024))
+MENU_CACHE_MAX_BYTES = int(os.getenv('MENU_CACHE_MAX_BYTES', 4 * 1024 * 1024))
+TENANT_CACHE_MAX_BYTES = int(os.getenv('TENANT_CACHE_MAX_BYTES', 1024 * 1024))
+SKIP_RULES_CACHE_MAX_BYTES = int(os.getenv('SKIP_RULES_CACHE_MAX_BYTES', 256 * 1024))
+ENGINE_PREF_CACHE_MAX_BYTES = int(os.getenv('ENGINE_PREF_CACHE_MAX_BYTES', 128 * 1024))
+
+# 快取後端：local（每個行程各自的記憶體快取）或 shared（同主機所有 worker 共用 SQLite 檔案）
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'local').lower()
+SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', 'shared_cache.db')
+SHARED_CACHE_L1_SIZE = 200  # shared 模式下每個 worker 的記憶體熱快取大小 (記錄數)
+
+# 持久化翻譯快取（L2，本機 SQLite，定時重啟後仍保留）
+PERSISTENT_CACHE_ENABLED = os.getenv('PERSISTENT_CACHE_ENABLED', 'True').lower() == 'true'
+PERSISTENT_CACHE_PATH = os.getenv('PERSISTENT_CACHE_PATH', 'translation_cache.db')
+PERSISTENT_CACHE_TTL = 7 * 86400  # 持久化快取保留時間 (秒)
+PERSISTENT_CACHE_MAX_ROWS = 50000  # 持久化快取最多筆數
+PERSISTENT_CACHE_FLUSH_INTERVAL = 2  # 批次寫入間隔 (秒)
+PERSISTENT_CACHE_BATCH_SIZE = 100  # 待寫入達此筆數時立即寫入
+PERSISTENT_CACHE_MAINTENANCE_INTERVAL = 600  # 清除過期與超出上限資料的間隔 (秒)
 
 # ============== 日誌設定 ==============
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -14,11 +14,13 @@ import hmac
 import hashlib
 import base64
 
-app = Flask(__name__)
+import config
+from services import translation_service
+from translations import deepl_translator
+from utils import line_utils
+from utils.worker_pool import translation_pool
 
-# 翻譯執行緒限制 - 防止過多並發翻譯導致系統卡死
-MAX_CONCURRENT_TRANSLATIONS = 4
-translation_semaphore = threading.Semaphore(MAX_CONCURRENT_TRANSLATIONS)
+app = Flask(__name__)
 
 # 載入 .env 檔（若存在），讓本機開發也能讀到 DEEPL_API_KEY 等設定
 load_dotenv()
@@ -821,7 +823,7 @@ else:
     print("⚠️ 未設定 DEEPL_API_KEY，將只使用 Google 翻譯。")
 
 
-def _translate_with_deepl(text, target_lang):
+def _translate_with_deepl(text, target_lang, source_lang=None):
     """使用 DeepL API 翻譯。使用 Session 重用連線，timeout (3, 8)，最多 retry 1次"""
 
     if not DEEPL_API_KEY:
@@ -855,17 +857,22 @@ def _translate_with_deepl(text, target_lang):
         return None, 'unsupported_language'
 
     url = f"{DEEPL_API_BASE_URL.rstrip('/')}/v2/translate"
+    data = {
+        'auth_key': DEEPL_API_KEY,
+        'text': text,
+        'target_lang': deepl_target,
+    }
+    # 來源語言（DeepL 不支援的交給 DeepL 自動偵測）
+    deepl_source = deepl_translator.DEEPL_SOURCE_LANGS.get(source_lang)
+    if deepl_source:
+        data['source_lang'] = deepl_source
     
     max_retries = 2  # 1 次原始 + 1 次 retry
     for attempt in range(1, max_retries + 1):
         try:
             resp = deepl_session.post(
                 url,
-                data={
-                    'auth_key': DEEPL_API_KEY,
-                    'text': text,
-                    'target_lang': deepl_target,
-                },
+                data=data,
                 timeout=(3, 8),  # (connect_timeout, read_timeout)
             )
         except requests.Timeout as e:
@@ -926,13 +933,13 @@ def _translate_with_deepl(text, target_lang):
     return None, 'unknown_error'
 
 
-def _translate_with_google(text, target_lang):
+def _translate_with_google(text, target_lang, source_lang=None):
     """使用 Google Translate 非官方 API。使用 Session 重用連線，timeout (2, 4)，最多 retry 1次"""
 
     url = "https://translate.googleapis.com/translate_a/single"
     params = {
         'client': 'gtx',
-        'sl': 'auto',
+        'sl': source_lang or 'auto',
         'tl': target_lang,
         'dt': 't',
         'q': text,
@@ -1000,7 +1007,7 @@ def _translate_with_google(text, target_lang):
     return None, 'unknown_error'
 
 
-def translate_text(text, target_lang, prefer_deepl_first=False, group_id=None):
+def translate_text(text, target_lang, prefer_deepl_first=False, group_id=None, source_lang=None):
     """
     統一翻譯入口。翻譯策略：
     1. 優先嘗試 Google
@@ -1012,8 +1019,12 @@ def translate_text(text, target_lang, prefer_deepl_first=False, group_id=None):
     if not text or text.strip().replace(' ', '').replace('.', '').replace(',', '').isdigit():
         return text
 
+    # 原文已經是目標語言
+    if source_lang == target_lang:
+        return text
+
     # 1. 優先嘗試 Google
-    translated, google_reason = _translate_with_google(text, target_lang)
+    translated, google_reason = _translate_with_google(text, target_lang, source_lang)
     
     if translated:
         # Google 成功
@@ -1025,7 +1036,7 @@ def translate_text(text, target_lang, prefer_deepl_first=False, group_id=None):
     
     # 2. Google 失敗，嘗試 DeepL fallback
     print(f"⚠️ [翻譯] Google 失敗 ({google_reason})，嘗試 DeepL fallback，語言: {target_lang}")
-    translated, deepl_reason = _translate_with_deepl(text, target_lang)
+    translated, deepl_reason = _translate_with_deepl(text, target_lang, source_lang)
     
     if translated:
         # DeepL 成功
@@ -1044,41 +1055,72 @@ def translate_text(text, target_lang, prefer_deepl_first=False, group_id=None):
     return "翻譯暫時失敗，請稍後再試"
 
 
-def _format_translation_results(text, langs, prefer_deepl_first=False, group_id=None):
-    """將多語言翻譯結果組成一段文字。"""
+def _format_translation_results(text, langs, prefer_deepl_first=False, group_id=None, timeout=None):
+    """將多語言翻譯結果組成一段文字（多語言時使用共用執行緒池並行翻譯，並依固定語言順序輸出）。
+    不需翻譯的訊息與原文相同的語言會略過，全部略過時回傳空字串。"""
+
+    if config.SKIP_NON_TRANSLATABLE and translation_service.is_non_translatable(text, langs, group_id=group_id):
+        return ''
+
+    source_lang, langs = translation_service.skip_source_language(text, langs)
+    if not langs:
+        return ''
+
+    if config.TRANSLATION_FANOUT_ENABLED and len(langs) > 1:
+        pairs = translation_service.translate_languages(
+            translate_text, text, langs, timeout=timeout,
+            prefer_deepl_first=prefer_deepl_first, group_id=group_id, source_lang=source_lang)
+    else:
+        pairs = [(lang, translate_text(text, lang, prefer_deepl_first=prefer_deepl_first, group_id=group_id,
+                                       source_lang=source_lang))
+                 for lang in translation_service.order_languages(langs)]
 
     results = []
-    for lang in langs:
-        translated = translate_text(text, lang, prefer_deepl_first=prefer_deepl_first, group_id=group_id)
+    for lang, translated in pairs:
+        if translated is None:
+            translated = translation_service.FANOUT_TIMEOUT_MESSAGE
         results.append(f"[{lang}] {translated}")
     return '\n'.join(results)
 
 
-def _async_translate_and_reply(reply_token, text, langs, prefer_deepl_first=False, group_id=None):
-    """在背景執行緒中翻譯並用 reply_message 回覆，避免阻塞 webhook。加入 semaphore 限制並發數"""
+def _reply_busy(reply_token):
+    """回覆翻譯忙碌訊息"""
+    try:
+        line_bot_api.reply_message(reply_token,
+                                   TextSendMessage(text="⏳ 翻譯忙碌中，請稍後再試"))
+    except:
+        pass  # reply 失敗不重試
 
-    # 取得 semaphore，若無法取得則直接回傳忙碌訊息
-    acquired = translation_semaphore.acquire(blocking=False)
-    if not acquired:
-        print(f"⚠️ 翻譯執行緒已滿，拒絕新翻譯請求")
-        try:
-            line_bot_api.reply_message(reply_token,
-                                       TextSendMessage(text="⏳ 翻譯忙碌中，請稍後再試"))
-        except:
-            pass  # reply 失敗不重試
-        return
+
+def _async_translate_and_reply(reply_token, text, langs, prefer_deepl_first=False, group_id=None, deadline=None):
+    """在翻譯工作執行緒中翻譯並用 reply_message 回覆，避免阻塞 webhook。並發數由 translation_pool 限制"""
 
     try:
         # 為了避免 set 在其他地方被修改，先轉成 list
         lang_list = list(langs)
-        result_text = _format_translation_results(text, lang_list, prefer_deepl_first=prefer_deepl_first, group_id=group_id)
+        # 依 reply token 剩餘時間縮短翻譯期限
+        timeout = line_utils.remaining_budget(deadline, config.TRANSLATION_FANOUT_TIMEOUT)
+        result_text = _format_translation_results(text, lang_list, prefer_deepl_first=prefer_deepl_first,
+                                                  group_id=group_id, timeout=timeout)
+        if not result_text:  # 不需翻譯或原文已是所有目標語言，不需回覆
+            return
         line_bot_api.reply_message(reply_token,
                                    TextSendMessage(text=result_text))
     except Exception as e:
         print(f"❌ 非同步翻譯回覆失敗: {type(e).__name__}: {e}")
         # 失敗不重試，避免連鎖反應
-    finally:
-        translation_semaphore.release()  # 確保釋放 semaphore
+
+
+def _submit_translation(event, text, langs, prefer_deepl_first=False, group_id=None):
+    """依 reply token 期限將翻譯工作排入長駐工作池；佇列已滿或來不及時才回覆忙碌訊息"""
+    reply_token = event['replyToken']
+    accepted = translation_pool.submit(
+        _async_translate_and_reply, reply_token, text, list(langs),
+        prefer_deepl_first, group_id,
+        deadline=line_utils.get_reply_deadline(event),
+        on_expired=lambda: _reply_busy(reply_token))
+    if not accepted:
+        _reply_busy(reply_token)
 
 def reply(token, message_content):
     from linebot.models import FlexSendMessage
@@ -1600,13 +1642,10 @@ def webhook():
                 engine_pref = get_engine_pref(group_id)
                 prefer_deepl_first = (engine_pref == 'deepl')
 
-                # 使用背景 thread + reply_message，避免阻塞 LINE callback（避免 499），
+                # 排入翻譯工作池 + reply_message，避免阻塞 LINE callback（避免 499），
                 # 同時不消耗 LINE 的 push 每月額度。
-                threading.Thread(
-                    target=_async_translate_and_reply,
-                    args=(event['replyToken'], text, list(langs),
-                          prefer_deepl_first, group_id),
-                    daemon=True).start()
+                _submit_translation(event, text, langs,
+                                    prefer_deepl_first, group_id)
                 continue
             elif text.startswith('!翻譯'):  # 手動翻譯指令
                 text_to_translate = text[3:].strip()
@@ -1616,11 +1655,8 @@ def webhook():
                     engine_pref = get_engine_pref(group_id)
                     prefer_deepl_first = (engine_pref == 'deepl')
 
-                    threading.Thread(
-                        target=_async_translate_and_reply,
-                        args=(event['replyToken'], text_to_translate,
-                              list(langs), prefer_deepl_first, group_id),
-                        daemon=True).start()
+                    _submit_translation(event, text_to_translate,
+                                        langs, prefer_deepl_first, group_id)
                     continue
     return 'OK'
 
@@ -6,6 +6,7 @@ FanFan LINE Bot - 主入口文件 (模組化版本)
 ├── config.py (配置常數)
 ├── models.py (資料庫模型)
 ├── translations/ (翻譯引擎)
+│   ├── registry.py (引擎註冊表)
 │   ├── deepl_translator.py
 │   └── google_translator.py
 ├── services/ (業務邏輯)
@@ -44,11 +45,12 @@ from models import db, init_db, GroupTranslateSetting, GroupActivity, GroupEngin
 
 # 導入服務
 from services import translation_service, tenant_service, group_service
-from translations import deepl_translator
+from translations import deepl_translator, registry
 
 # 導入工具
 from utils import file_utils, system_utils, line_utils
-from utils.cache import get_cache_stats
+from utils.cache import get_cache_stats, get_menu_cache, set_menu_cache, invalidate_menu_cache
+from utils.worker_pool import translation_pool
 
 # 導入 LINE Bot
 from linebot import LineBotApi, WebhookHandler
@@ -66,13 +68,6 @@ init_db(app)
 line_bot_api = LineBotApi(config.CHANNEL_ACCESS_TOKEN)
 handler = WebhookHandler(config.CHANNEL_SECRET.decode('utf-8') if isinstance(config.CHANNEL_SECRET, bytes) else config.CHANNEL_SECRET)
 
-# 翻譯執行緒限制
-translation_semaphore = threading.Semaphore(config.MAX_CONCURRENT_TRANSLATIONS)
-
-# 選單快取
-menu_cache = {}  # group_id -> (menu_dict, timestamp)
-MENU_CACHE_TTL = 60  # 60 秒更新一次
-
 # 啟動時間
 start_time = time.time()
 
@@ -89,6 +84,7 @@ def init_app():
     
     # 載入 DeepL 支援語言
     deepl_translator.load_deepl_supported_languages()
+    registry.refresh_capabilities()
     
     print("✅ 應用啟動完成！")
 
@@ -148,11 +144,10 @@ def language_selection_message(group_id):
     建立語言選擇選單（已優化：快取）
     """
     # 1️⃣ 檢查快取
-    if group_id in menu_cache:
-        cached_menu, cached_time = menu_cache[group_id]
-        if time.time() - cached_time < MENU_CACHE_TTL:
-            print(f"✅ [選單快取命中] {group_id}")
-            return cached_menu
+    cached_menu = get_menu_cache(group_id)
+    if cached_menu is not None:
+        print(f"✅ [選單快取命中] {group_id}")
+        return cached_menu
     
     # 2️⃣ 生成選單
     current_langs = group_service.get_group_langs(group_id)
@@ -214,30 +209,47 @@ def language_selection_message(group_id):
     }
     
     # 3️⃣ 設定快取
-    menu_cache[group_id] = (menu_msg, time.time())
+    set_menu_cache(group_id, menu_msg)
     return menu_msg
 
 # ============== 非同步翻譯 ==============
-def _async_translate_and_reply(reply_token, text, langs, group_id=None):
-    """在背景執行緒中翻譯並回覆"""
-    
-    acquired = translation_semaphore.acquire(blocking=False)
-    if not acquired:
-        print(f"⚠️ 翻譯執行緒已滿，拒絕新翻譯請求")
-        try:
-            line_bot_api.reply_message(reply_token, TextSendMessage(text="⏳ 翻譯忙碌中，請稍後再試"))
-        except:
-            pass
-        return
+BUSY_MESSAGE = "⏳ 翻譯忙碌中，請稍後再試"
+
 
+def _reply_busy(reply_token):
+    """回覆翻譯忙碌訊息（失敗不重試）"""
+    try:
+        line_bot_api.reply_message(reply_token, TextSendMessage(text=BUSY_MESSAGE))
+    except:
+        pass
+
+
+def _async_translate_and_reply(reply_token, text, langs, group_id=None, engine_pref=None, deadline=None):
+    """在翻譯工作執行緒中翻譯並回覆（依 reply token 剩餘時間縮短翻譯期限）"""
     try:
         lang_list = list(langs)
-        result_text = translation_service.format_translation_results(text, lang_list, group_id=group_id)
+        timeout = line_utils.remaining_budget(deadline, config.TRANSLATION_FANOUT_TIMEOUT)
+        result_text = translation_service.format_translation_results(text, lang_list, group_id=group_id,
+                                                                     timeout=timeout, engine_pref=engine_pref)
+        if not result_text:  # 不需翻譯或原文已是所有目標語言，不需回覆
+            return
         line_bot_api.reply_message(reply_token, TextSendMessage(text=result_text))
     except Exception as e:
         print(f"❌ 非同步翻譯回覆失敗: {type(e).__name__}: {e}")
-    finally:
-        translation_semaphore.release()
+
+
+def submit_translation(event, text, langs, group_id=None):
+    """將翻譯工作依 reply token 期限排入翻譯工作池，佇列已滿時回覆忙碌訊息"""
+    reply_token = event['replyToken']
+    deadline = line_utils.get_reply_deadline(event)
+    # 引擎偏好需查詢資料庫，在 webhook 執行緒（有 app context）先取得再傳給工作執行緒
+    engine_pref = group_service.get_engine_pref(group_id, default='') if group_id else ''
+    accepted = translation_pool.submit(
+        _async_translate_and_reply, reply_token, text, list(langs), group_id, engine_pref,
+        deadline=deadline,
+        on_expired=lambda: _reply_busy(reply_token))
+    if not accepted:
+        _reply_busy(reply_token)
 
 # ============== Webhook 路由 ==============
 def verify_webhook_signature(signature, body_text):
@@ -335,7 +347,7 @@ def handle_postback(event, user_id, group_id):
     # 重設
     if data_post == 'reset':
         group_service._delete_group_langs_from_db(group_id)
-        menu_cache.pop(group_id, None)  # 清除快取
+        invalidate_menu_cache(group_id)  # 清除快取
         line_utils.create_reply_message(line_bot_api, event['replyToken'],
                                        {"type": "text", "text": "✅ 已清除翻譯語言設定！"})
         return
@@ -349,7 +361,7 @@ def handle_postback(event, user_id, group_id):
         else:
             current_langs.add(code)
         group_service.set_group_langs(group_id, current_langs)
-        menu_cache.pop(group_id, None)  # 清除快取
+        invalidate_menu_cache(group_id)  # 清除快取
         
         langs = [f"{label} ({code})" for label, code in config.LANGUAGE_MAP.items()
                  if code in group_service.get_group_langs(group_id)]
@@ -373,10 +385,7 @@ def handle_message(event, user_id, group_id):
     auto_translate = data.get('auto_translate', {}).get(group_id, True)
     if auto_translate:
         langs = group_service.get_group_langs(group_id)
-        threading.Thread(
-            target=_async_translate_and_reply,
-            args=(event['replyToken'], text, list(langs), group_id),
-            daemon=True).start()
+        submit_translation(event, text, langs, group_id)
         return
 
     # 手動翻譯指令 (!翻譯)
@@ -384,10 +393,7 @@ def handle_message(event, user_id, group_id):
         text_to_translate = text[3:].strip()
         if text_to_translate:
             langs = group_service.get_group_langs(group_id)
-            threading.Thread(
-                target=_async_translate_and_reply,
-                args=(event['replyToken'], text_to_translate, list(langs), group_id),
-                daemon=True).start()
+            submit_translation(event, text_to_translate, langs, group_id)
         return
 
     # 其他指令處理（簡化版本）
@@ -420,8 +426,9 @@ def status():
         "uptime": uptime_str,
         "uptime_seconds": int(uptime),
         "memory_mb": system_utils.monitor_memory(),
-        "translation_queue": config.MAX_CONCURRENT_TRANSLATIONS,
+        "translation_queue": translation_pool.stats(),
         "cache": cache_stats,
+        "translation": translation_service.get_translation_stats(),
     }, 200
 
 # ============== 主程式 ==============
@@ -8,7 +8,14 @@ from utils.cache import (
     get_group_langs_cache,
     set_group_langs_cache,
     invalidate_group_langs_cache,
+    get_skip_rules_cache,
+    set_skip_rules_cache,
+    invalidate_skip_rules_cache,
+    get_engine_pref_cache,
+    set_engine_pref_cache,
+    invalidate_engine_pref_cache,
 )
+from translations import registry
 import config
 
 
@@ -97,34 +104,53 @@ def touch_group_activity(group_id):
         db.session.rollback()
 
 
-def get_engine_pref(group_id):
-    """取得群組翻譯引擎偏好（google / deepl），優先使用資料庫。"""
+def get_engine_pref(group_id, default="google"):
+    """
+    取得群組翻譯引擎偏好（已註冊的引擎名稱），優先使用資料庫。
+
+    Args:
+        group_id: 群組 ID
+        default: 沒有設定偏好時的回傳值
+    """
+    if not group_id:
+        return default
+    cached = get_engine_pref_cache(group_id)
+    if cached is not None:
+        return cached or default
+
+    engine = None
+    db_failed = False
     # 先看資料庫
-    if db and group_id:
+    if db:
         try:
             pref = GroupEnginePreference.query.filter_by(group_id=group_id).first()
-            if pref and pref.engine in ("google", "deepl"):
-                return pref.engine
+            if pref and registry.is_registered(pref.engine):
+                engine = pref.engine
         except Exception:
-            pass
+            db_failed = True  # 例如在沒有 app context 的執行緒查詢
 
     # 退回 data.json 記憶體
-    data = load_json(config.DATA_FILE)
-    engine = data.get("translate_engine_pref", {}).get(group_id)
-    if engine in ("google", "deepl"):
-        return engine
-    return "google"  # 預設使用 Google
+    if engine is None:
+        engine = load_json(config.DATA_FILE).get("translate_engine_pref", {}).get(group_id)
+        if not registry.is_registered(engine):
+            engine = None
+
+    # 資料庫查詢失敗時不快取退回的結果，避免之後一直忽略資料庫中的偏好
+    if not db_failed:
+        set_engine_pref_cache(group_id, engine or '')
+    return engine or default
 
 
 def set_engine_pref(group_id, engine):
     """設定群組翻譯引擎偏好，寫入 data.json 與資料庫。"""
-    if engine not in ("google", "deepl"):
+    if not registry.is_registered(engine):
         engine = "google"
 
     data = load_json(config.DATA_FILE)
     data.setdefault("translate_engine_pref", {})
     data["translate_engine_pref"][group_id] = engine
     save_json(config.DATA_FILE, data)
+    invalidate_engine_pref_cache(group_id)
 
     if not db or not group_id:
         return
@@ -140,6 +166,37 @@ def set_engine_pref(group_id, engine):
         db.session.rollback()
 
 
+def get_skip_rules(group_id):
+    """
+    取得群組的略過翻譯規則（存在 data.json 的 skip_rules）
+    
+    Returns:
+        {"disabled": [照常翻譯的類別...], "patterns": [視為不需翻譯的正則...]}，沒有設定時為 {}
+    """
+    if not group_id:
+        return {}
+    cached = get_skip_rules_cache(group_id)
+    if cached is not None:
+        return cached
+
+    data = load_json(config.DATA_FILE)
+    rules = data.get('skip_rules', {}).get(group_id) or {}
+    set_skip_rules_cache(group_id, rules)
+    return rules
+
+
+def set_skip_rules(group_id, disabled=None, patterns=None):
+    """設定群組的略過翻譯規則（disabled: 照常翻譯的類別，patterns: 額外略過的正則）"""
+    data = load_json(config.DATA_FILE)
+    data.setdefault('skip_rules', {})
+    data['skip_rules'][group_id] = {
+        'disabled': list(disabled or []),
+        'patterns': list(patterns or []),
+    }
+    save_json(config.DATA_FILE, data)
+    invalidate_skip_rules_cache(group_id)
+
+
 def get_group_stats_for_status():
     """給 /狀態 與 /統計 用的群組統計資訊。"""
     if db:
@@ -4,6 +4,7 @@ Tenant service - 租戶管理服務
 import json
 from datetime import datetime, timedelta
 from utils.file_utils import load_json, save_json
+from utils.cache import get_tenant_cache, set_tenant_cache, invalidate_tenant_cache
 import config
 
 
@@ -78,6 +79,7 @@ def add_group_to_tenant(user_id, group_id):
     if group_id not in tenants[user_id].get("groups", []):
         tenants[user_id].setdefault("groups", []).append(group_id)
         save_json(config.DATA_FILE, data)
+        invalidate_tenant_cache(group_id)
     return True
 
 
@@ -106,3 +108,23 @@ def check_group_access(group_id):
         return is_tenant_valid(user_id)
     # 預設：未設定租戶的群組全功能開放
     return True
+
+
+def get_cache_partition(group_id):
+    """
+    取得群組在翻譯快取中的分區與配額（有效租戶的群組共用租戶分區與較高配額）
+    
+    Returns:
+        (partition, quota)
+    """
+    cached = get_tenant_cache(group_id)
+    if cached is not None:
+        return cached
+
+    user_id, tenant = get_tenant_by_group(group_id)
+    if user_id and is_tenant_valid(user_id):
+        partition = (f"tenant:{user_id}", config.CACHE_TENANT_PARTITION_QUOTA)
+    else:
+        partition = (f"group:{group_id}", config.CACHE_PARTITION_QUOTA)
+    set_tenant_cache(group_id, partition)
+    return partition
@@ -1,9 +1,27 @@
 """
-Translation service - 統一翻譯服務（協調 Google 和 DeepL）
+Translation service - 統一翻譯服務（依路由協調已註冊的翻譯引擎）
 """
-from translations import google_translator, deepl_translator
+import functools
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from translations import registry
+from translations.placeholders import get_placeholder_stats
+from translations.timeouts import get_timeout_stats
 import config
+from utils.singleflight import SingleFlight
+from utils.metrics import ThreadLocalCounters, LatencyWindow
+from utils.lang_detect import detect_language
+from utils import message_classifier
+from utils.circuit_breaker import CircuitBreaker, OPEN
+from utils.negative_cache import NegativeCache
+from utils.hedge import HedgeBudget
+from utils.rate_limiter import TokenBucket
+from utils.micro_batcher import MicroBatcher
+from utils.text_chunker import chunk_text, join_chunks, group_by_size, joined_size
 from utils.cache import (
+    translation_cache_key,
     get_translation_cache,
     set_translation_cache,
     get_group_langs_cache,
@@ -11,19 +29,144 @@ from utils.cache import (
     invalidate_group_langs_cache,
 )
 
+# 多語言並行翻譯共用的執行緒池（有上限，所有訊息共用）
+_fanout_executor = ThreadPoolExecutor(
+    max_workers=config.TRANSLATION_FANOUT_WORKERS,
+    thread_name_prefix='translate-fanout',
+)
+
+# 固定的語言輸出順序（依選單順序）
+_LANGUAGE_ORDER = {code: i for i, code in enumerate(config.LANGUAGE_MAP.values())}
+
+FANOUT_TIMEOUT_MESSAGE = "翻譯逾時，請稍後再試"
+
+# 相同 (正規化原文, 目標語言, 引擎順序) 的進行中翻譯只呼叫上游一次
+_inflight = SingleFlight()
+
+# 片段快取：以行拆分，過長的行再於句尾標點後的空白處拆句（保留分隔符以便組回）
+_LINE_SPLIT_RE = re.compile(r'(\n+)')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[。！？!?.])(\s+)')
+_segment_counters = ThreadLocalCounters()
+_detect_counters = ThreadLocalCounters()
+
+# 翻譯引擎由 translations.registry 註冊；與引擎健康無關的失敗原因不記入斷路器
+_NEUTRAL_REASONS = {'unsupported_language', 'no_api_key'}
+
+
+def _probe_engine(name):
+    """斷路器的背景探測：翻譯一個短字串"""
+    translated, _ = registry.get_engine(name).translate('hello', 'zh-TW')
+    return translated is not None
+
+
+# 各引擎的斷路器與最近成功呼叫的延遲（路由與對沖門檻用），第一次用到時建立
+_engine_state_lock = threading.Lock()
+_breakers = {}
+_latency = {}
+
+
+def _breaker(name):
+    """取得引擎的斷路器（斷開時直接略過，不再等到逾時才 fallback）"""
+    with _engine_state_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                window=config.CIRCUIT_WINDOW_SECONDS,
+                min_calls=config.CIRCUIT_MIN_CALLS,
+                error_rate=config.CIRCUIT_ERROR_RATE,
+                slow_call=config.CIRCUIT_SLOW_CALL_SECONDS,
+                slow_rate=config.CIRCUIT_SLOW_RATE,
+                open_seconds=config.CIRCUIT_OPEN_SECONDS,
+                half_open_calls=config.CIRCUIT_HALF_OPEN_CALLS,
+                probe=functools.partial(_probe_engine, name),
+            )
+        return breaker
 
-def translate_text(text, target_lang, group_id=None):
+
+def _latency_window(name):
+    """取得引擎最近成功呼叫的延遲視窗"""
+    with _engine_state_lock:
+        window = _latency.get(name)
+        if window is None:
+            window = _latency[name] = LatencyWindow(size=config.HEDGE_LATENCY_SAMPLES)
+        return window
+
+
+for _name in registry.engine_names():
+    _breaker(_name)
+    _latency_window(_name)
+
+# 各引擎的用戶端限流（超出預算時直接改用其他引擎，收到 429 時自動降速；未列出的引擎不限流）
+_limiters = {
+    'google': TokenBucket('google', rate=config.GOOGLE_RATE_LIMIT, burst=config.GOOGLE_RATE_BURST,
+                          backoff=config.RATE_LIMIT_BACKOFF, min_rate=config.RATE_LIMIT_MIN_RATE,
+                          cooldown=config.RATE_LIMIT_COOLDOWN, recovery=config.RATE_LIMIT_RECOVERY),
+    'deepl': TokenBucket('deepl', rate=config.DEEPL_RATE_LIMIT, burst=config.DEEPL_RATE_BURST,
+                         backoff=config.RATE_LIMIT_BACKOFF, min_rate=config.RATE_LIMIT_MIN_RATE,
+                         cooldown=config.RATE_LIMIT_COOLDOWN, recovery=config.RATE_LIMIT_RECOVERY),
+}
+_route_counters = ThreadLocalCounters()
+
+# 負面快取：引擎回報不支援或持續回傳無法解析結果的 (引擎, 語言)，以及翻譯失敗的 (引擎, 文字)
+_PERSISTENT_REASONS = {'parse_error', 'invalid_response', 'empty_response', 'http_400'}
+
+
+def _probe_engine_lang(key):
+    """(引擎, 語言) 到期後的背景重試：翻譯一個短字串"""
+    name, target_lang = key
+    translated, _ = registry.get_engine(name).translate('hello', target_lang)
+    return translated is not None
+
+
+_lang_negative = NegativeCache(
+    '負面快取',
+    ttl=config.NEGATIVE_CACHE_TTL,
+    max_ttl=config.NEGATIVE_CACHE_MAX_TTL,
+    threshold=config.NEGATIVE_CACHE_FAILURES,
+    probe=_probe_engine_lang,
+)
+_text_negative = NegativeCache(
+    '文字負面快取',
+    ttl=config.NEGATIVE_TEXT_CACHE_TTL,
+    max_size=config.NEGATIVE_TEXT_CACHE_SIZE,
+)
+
+# 對沖請求：第一順位引擎超過其 p90 仍未回應時同時送第二順位，取先回來的結果
+_hedge_budget = HedgeBudget(ratio=config.HEDGE_BUDGET_RATIO)
+_hedge_slots = threading.BoundedSemaphore(config.HEDGE_MAX_INFLIGHT)
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=config.HEDGE_MAX_INFLIGHT * 2,  # 每個對沖請求最多佔用兩個執行緒
+    thread_name_prefix='translate-hedge',
+)
+_hedge_counters = ThreadLocalCounters()
+_batch_counters = ThreadLocalCounters()
+
+# 長訊息切塊：每塊不超過引擎鏈中最小的單次上限，以獨立的執行緒池並行翻譯
+# （不共用 fan-out 執行緒池，避免在 fan-out 工作中等待同一個池而卡住）
+CHUNK_MAX_CHARS = min(config.GOOGLE_MAX_CHARS, config.DEEPL_MAX_CHARS)
+_chunk_executor = ThreadPoolExecutor(
+    max_workers=config.CHUNK_WORKERS,
+    thread_name_prefix='translate-chunk',
+)
+_chunk_counters = ThreadLocalCounters()
+
+
+def translate_text(text, target_lang, group_id=None, source_lang=None, engine_pref=None):
     """
     統一翻譯入口。翻譯策略：
     1. 檢查快取
-    2. 優先嘗試 Google
-    3. Google 失敗 -> fallback 到 DeepL
-    4. Google 和 DeepL 都失敗 -> 回傳錯誤訊息
+    2. 依群組偏好、語言支援、斷路器狀態與最近延遲決定引擎順序
+    3. 相同內容正在翻譯中 -> 等待並共用結果（不重複呼叫上游）
+    4. 依序嘗試各引擎，失敗時 fallback 到下一個
+    5. 所有引擎都失敗 -> 回傳錯誤訊息
     
     Args:
         text: 要翻譯的文本
         target_lang: 目標語言代碼
-        group_id: 群組 ID（用於統計）
+        group_id: 群組 ID（用於統計與引擎偏好）
+        source_lang: 來源語言代碼（None 表示由引擎自動偵測）
+        engine_pref: 已在呼叫端取得的群組引擎偏好（'' 表示沒有偏好，None 表示由群組查詢）
     
     Returns:
         翻譯後的文本或錯誤訊息
@@ -32,53 +175,630 @@ def translate_text(text, target_lang, group_id=None):
     if not text or text.strip().replace(' ', '').replace('.', '').replace(',', '').isdigit():
         return text
 
+    # 原文已經是目標語言
+    if source_lang == target_lang:
+        return text
+
     # 1️⃣ 檢查快取（新增）
-    cached_result = get_translation_cache(text, target_lang)
+    partition = _cache_partition(group_id)
+    cached_result = get_translation_cache(text, target_lang, partition=partition)
     if cached_result is not None:
         print(f"✅ [快取命中] {text[:20]}... -> {target_lang}")
         return cached_result
 
-    # 2️⃣ 優先嘗試 Google
-    translated, google_reason = google_translator.translate(text, target_lang)
+    # 2️⃣ 決定引擎順序
+    engines = route_engines(target_lang, group_id, engine_pref)
+    if not engines:
+        print(f"❌ [翻譯] 沒有可用於 {target_lang} 的翻譯引擎（不支援或暫時略過）")
+        return "翻譯暫時失敗，請稍後再試"
+
+    # 3️⃣ 合併同時進行的相同翻譯
+    key = (translation_cache_key(text, target_lang), '>'.join(engines))
+    translated, shared = _inflight.do(key, _translate_upstream, text, target_lang, partition, source_lang, engines)
+    if translated is None:
+        return "翻譯暫時失敗，請稍後再試"
+
+    if shared:
+        print(f"🔗 [合併請求] {text[:20]}... -> {target_lang}")
+    elif group_id:
+        from services.tenant_service import update_tenant_stats_by_group
+        update_tenant_stats_by_group(group_id, translate_count=1, char_count=len(text))
+    return translated
+
+
+def _cache_partition(group_id):
+    """取得群組的快取分區（群組或租戶），沒有群組時不分區"""
+    if not group_id:
+        return None
+    from services.tenant_service import get_cache_partition
+    return get_cache_partition(group_id)
+
+
+def route_engines(target_lang, group_id=None, engine_pref=None):
+    """
+    決定這次翻譯的引擎順序：
+    1. 只保留支援目標語言、且不在負面快取中的引擎（依預設順序 ENGINE_ORDER）
+    2. 群組沒有指定偏好時，第一順位最近明顯比第二順位慢則互換
+    3. 群組偏好的引擎排第一
+    4. 斷路器斷開的引擎移到最後（仍保留，作為最後手段）
     
-    if translated:
-        # Google 成功，設定快取
-        set_translation_cache(text, target_lang, translated)
-        if group_id:
-            from services.tenant_service import update_tenant_stats_by_group
-            update_tenant_stats_by_group(group_id, translate_count=1, char_count=len(text))
-        return translated
+    engine_pref 為呼叫端已取得的群組偏好（'' 表示沒有偏好）；None 時才依 group_id 查詢，
+    查詢需要資料庫，應盡量在有 app context 的執行緒（webhook）先取得再傳入
+    
+    Returns:
+        引擎名稱 tuple，沒有可用的引擎時為空 tuple
+    """
+    engines = [name for name in registry.engine_names() if registry.supports(name, target_lang)]
+    if config.NEGATIVE_CACHE_ENABLED:
+        available = [name for name in engines if not _lang_negative.is_blocked((name, target_lang))]
+        _route_counters.incr('negative_skips', len(engines) - len(available))
+        engines = available
+    if not engines:
+        _route_counters.incr('unsupported')
+        return ()
+
+    pref = engine_pref or None
+    if engine_pref is None and group_id:
+        from services.group_service import get_engine_pref
+        pref = get_engine_pref(group_id, default=None)
+
+    if pref is None and len(engines) > 1 and _is_slower(engines[0], engines[1]):
+        engines[0], engines[1] = engines[1], engines[0]
+        _route_counters.incr('latency_swaps')
+    if pref in engines and engines[0] != pref:
+        engines.remove(pref)
+        engines.insert(0, pref)
+        _route_counters.incr('preferred')
+    if config.CIRCUIT_BREAKER_ENABLED:
+        healthy = [name for name in engines if _breaker(name).state != OPEN]
+        if len(healthy) < len(engines):
+            _route_counters.incr('circuit_demotions')
+            engines = healthy + [name for name in engines if name not in healthy]
+
+    _route_counters.incr(f'first_{engines[0]}')
+    return tuple(engines)
+
+
+def _is_slower(first, second):
+    """first 最近的延遲中位數是否超過 second 的 ROUTER_SLOW_FACTOR 倍（樣本不足時不判斷）"""
+    first_window, second_window = _latency_window(first), _latency_window(second)
+    if min(first_window.count(), second_window.count()) < config.ROUTER_MIN_SAMPLES:
+        return False
+    return first_window.quantile(0.5) > second_window.quantile(0.5) * config.ROUTER_SLOW_FACTOR
+
+
+def _translate_upstream(text, target_lang, partition, source_lang, engines):
+    """
+    實際呼叫翻譯引擎，成功時寫入快取。多行 / 多句的訊息會拆成片段，
+    只有快取中沒有的片段才送到上游，最後依原順序組回。
     
-    # 3️⃣ Google 失敗，嘗試 DeepL fallback
-    print(f"⚠️ [翻譯] Google 失敗 ({google_reason})，嘗試 DeepL fallback，語言: {target_lang}")
-    translated, deepl_reason = deepl_translator.translate(text, target_lang)
+    Returns:
+        翻譯後的文本，失敗時為 None
+    """
+    segments, separators = _split_segments(text) if config.SEGMENT_CACHE_ENABLED else ([text], [])
+    if len(segments) > 1:
+        translated = _translate_segmented(segments, separators, target_lang, partition, source_lang, engines)
+    elif len(text) > CHUNK_MAX_CHARS:
+        translated = _translate_chunked(text, target_lang, source_lang, engines)
+    elif config.MICROBATCH_ENABLED and '\n' not in text:
+        translated = _microbatcher.submit((target_lang, source_lang, engines), text)
+    else:
+        translated = _translate_single(text, target_lang, source_lang, engines)
+
+    if translated:
+        set_translation_cache(text, target_lang, translated, partition=partition)
+    return translated
+
+
+def _call_engine(name, text, target_lang, source_lang=None):
+    """
+    呼叫單一引擎（經過限流與斷路器，並記錄結果與延遲）
     
+    Returns:
+        (translated_text, reason)；超出限流預算時 reason 為 'over_budget'，斷路器斷開時為 'circuit_open'，
+        此語言或這段文字最近在此引擎翻譯失敗時為 'negative_cached'
+    """
+    # 先檢查負面快取與斷路器，確定會送出才取用限流 token（不會送出的請求不消耗預算也不等待）
+    text_key = None
+    if config.NEGATIVE_CACHE_ENABLED:
+        text_key = (name, translation_cache_key(text, target_lang))
+        if _lang_negative.is_blocked((name, target_lang)) or _text_negative.is_blocked(text_key):
+            return None, 'negative_cached'
+
+    breaker = _breaker(name) if config.CIRCUIT_BREAKER_ENABLED else None
+    if breaker is not None and not breaker.allow():
+        return None, 'circuit_open'
+
+    limiter = _limiters.get(name) if config.RATE_LIMIT_ENABLED else None
+    if limiter is not None and not limiter.acquire(config.RATE_LIMIT_MAX_WAIT):
+        return None, 'over_budget'
+
+    start = time.monotonic()
+    translated, reason = registry.get_engine(name).translate(text, target_lang, source_lang=source_lang)
+    latency = time.monotonic() - start
     if translated:
-        # DeepL 成功，設定快取
-        set_translation_cache(text, target_lang, translated)
-        if group_id:
-            from services.tenant_service import update_tenant_stats_by_group
-            update_tenant_stats_by_group(group_id, translate_count=1, char_count=len(text))
-        return translated
+        _latency_window(name).record(latency)
+    if limiter is not None and reason == 'rate_limited':
+        limiter.penalize()
+    if breaker is not None and reason not in _NEUTRAL_REASONS:
+        breaker.record(translated is not None, latency)
+    if text_key is not None:
+        _record_negative(name, target_lang, translated is not None, reason)
+        if reason in _PERSISTENT_REASONS:
+            _text_negative.record_failure(text_key)
+    return translated, reason
+
+
+def _record_negative(name, target_lang, ok, reason):
+    """依呼叫結果更新 (引擎, 語言) 的負面快取"""
+    key = (name, target_lang)
+    if ok:
+        _lang_negative.record_success(key)
+    elif reason == 'unsupported_language':
+        _lang_negative.record_failure(key, immediate=True)
+    elif reason in _PERSISTENT_REASONS:
+        _lang_negative.record_failure(key)
+
+
+def _call_engine_many(name, texts, target_lang, source_lang=None):
+    """
+    以引擎的批次 API（translate_many）一次翻譯多段文字，整個請求經過限流與斷路器
     
-    # 4️⃣ DeepL 也失敗，判斷原因
-    if deepl_reason == 'unsupported_language':
-        print(f"ℹ️ [翻譯] DeepL 也不支援 {target_lang}")
+    Returns:
+        與 texts 對應的 [(translated_text, reason), ...]
+    """
+    if config.NEGATIVE_CACHE_ENABLED and _lang_negative.is_blocked((name, target_lang)):
+        return [(None, 'negative_cached')] * len(texts)
+    breaker = _breaker(name) if config.CIRCUIT_BREAKER_ENABLED else None
+    if breaker is not None and not breaker.allow():
+        return [(None, 'circuit_open')] * len(texts)
+    limiter = _limiters.get(name) if config.RATE_LIMIT_ENABLED else None
+    if limiter is not None and not limiter.acquire(config.RATE_LIMIT_MAX_WAIT):
+        return [(None, 'over_budget')] * len(texts)
+
+    start = time.monotonic()
+    results = registry.get_engine(name).translate_many(texts, target_lang, source_lang=source_lang)
+    latency = time.monotonic() - start
+    reasons = {reason for _, reason in results}
+    if limiter is not None and 'rate_limited' in reasons:
+        limiter.penalize()
+    if breaker is not None and not reasons <= _NEUTRAL_REASONS:
+        breaker.record(any(translated for translated, _ in results), latency)
+    if config.NEGATIVE_CACHE_ENABLED:
+        ok = any(translated for translated, _ in results)
+        _record_negative(name, target_lang, ok, next(iter(reasons)) if len(reasons) == 1 else None)
+    _batch_counters.incr(f'{name}_batch_calls')
+    _batch_counters.incr(f'{name}_batch_items', len(texts))
+    return results
+
+
+def _translate_single(text, target_lang, source_lang, engines):
+    """
+    翻譯單一文本（依引擎順序嘗試，失敗時 fallback 到下一個）
+    
+    Returns:
+        翻譯後的文本，失敗時為 None
+    """
+    if config.HEDGE_ENABLED and len(engines) > 1 and _hedge_slots.acquire(blocking=False):
+        try:
+            return _translate_hedged(text, target_lang, source_lang, engines)
+        finally:
+            _hedge_slots.release()
+    return _translate_fallback(text, target_lang, source_lang, engines, {})
+
+
+def _translate_fallback(text, target_lang, source_lang, engines, reasons):
+    """
+    依序嘗試 engines，reasons 為已失敗引擎的 {name: reason}（用於日誌）
     
-    # 5️⃣ Google 和 DeepL 都失敗
+    Returns:
+        翻譯後的文本，全部失敗時為 None
+    """
+    for name in engines:
+        if reasons:
+            failed = '、'.join(f"{failed_name} ({reason})" for failed_name, reason in reasons.items())
+            print(f"⚠️ [翻譯] {failed} 失敗，嘗試 {name} fallback，語言: {target_lang}")
+        translated, reasons[name] = _call_engine(name, text, target_lang, source_lang)
+        if translated:
+            return translated
+
+    unsupported = [name for name, reason in reasons.items() if reason == 'unsupported_language']
+    if unsupported:
+        print(f"ℹ️ [翻譯] {'、'.join(unsupported)} 不支援 {target_lang}")
+    failed = '、'.join(f"{name} ({reason})" for name, reason in reasons.items())
+    print(f"❌ [翻譯] {failed} 都失敗，語言: {target_lang}")
+    return None
+
+
+def _translate_chunked(text, target_lang, source_lang, engines):
     """
-    將多語言翻譯結果組成一段文字。
+    長文字依句子邊界切塊後並行翻譯，再依原分隔符組回
+    
+    Returns:
+        翻譯後的文本，任一塊失敗時為 None
+    """
+    chunks, separators = chunk_text(text, CHUNK_MAX_CHARS)
+    print(f"✂️ [切塊] {len(text)} 字切成 {len(chunks)} 塊並行翻譯 -> {target_lang}")
+    _chunk_counters.incr('messages')
+    _chunk_counters.incr('chunks', len(chunks))
+    futures = [_chunk_executor.submit(_translate_single, chunk, target_lang, source_lang, engines)
+               for chunk in chunks]
+    results = [future.result() for future in futures]
+    if any(result is None for result in results):
+        return None
+    return join_chunks(results, separators)
+
+
+def _hedge_delay(name):
+    """對沖門檻：引擎最近成功呼叫延遲的分位數（樣本不足時用預設值）"""
+    window = _latency_window(name)
+    if window.count() < config.HEDGE_MIN_SAMPLES:
+        return config.HEDGE_DEFAULT_DELAY
+    return max(config.HEDGE_MIN_DELAY, window.quantile(config.HEDGE_QUANTILE))
+
+
+def _translate_hedged(text, target_lang, source_lang, engines):
+    """
+    對沖翻譯：先送第一順位引擎，超過門檻仍未回應且預算允許時同時送第二順位，
+    取先成功的結果（較慢的一方結果直接忽略）；兩者都失敗時再依序嘗試其餘引擎
+    
+    Returns:
+        翻譯後的文本，失敗時為 None
+    """
+    primary_name, secondary_name = engines[0], engines[1]
+    _hedge_budget.on_request()
+    delay = _hedge_delay(primary_name)
+    primary = _hedge_executor.submit(_call_engine, primary_name, text, target_lang, source_lang)
+    try:
+        translated, reason = primary.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+    else:
+        if translated:
+            return translated
+        return _translate_fallback(text, target_lang, source_lang, engines[1:], {primary_name: reason})
+
+    if not _hedge_budget.try_spend():
+        translated, reason = primary.result()
+        if translated:
+            return translated
+        return _translate_fallback(text, target_lang, source_lang, engines[1:], {primary_name: reason})
+
+    print(f"🪁 [對沖] {primary_name} 超過 {delay:.2f}s 未回應，同時送出 {secondary_name}，語言: {target_lang}")
+    secondary = _hedge_executor.submit(_call_engine, secondary_name, text, target_lang, source_lang)
+    pending = {primary: primary_name, secondary: secondary_name}
+    reasons = {}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            translated, reasons[name] = future.result()
+            if translated:
+                _hedge_counters.incr(f'{name}_wins')
+                return translated
+
+    return _translate_fallback(text, target_lang, source_lang, engines[2:], reasons)
+
+
+def _translate_groups(texts, target_lang, source_lang, engines):
+    """
+    多段文字依單次上限分組，各組以 _translate_group 並行翻譯；
+    單段就超過上限的在目前執行緒切塊翻譯（切塊本身會用到切塊執行緒池）。
+    切塊執行緒中只做已確認不超過上限的翻譯，不會再往切塊執行緒池送工作（避免互相等待而卡住）
+    
+    Returns:
+        與 texts 對應的翻譯結果 list
+    """
+    results = [None] * len(texts)
+    futures = []
+    oversized = []
+    for group in group_by_size(texts, CHUNK_MAX_CHARS):
+        if len(group) == 1 and len(group[0][1]) > CHUNK_MAX_CHARS:
+            oversized.append(group[0])
+            continue
+        indexes = [index for index, _ in group]
+        group_texts = [text for _, text in group]
+        if len(group_texts) == 1:
+            future = _chunk_executor.submit(_translate_single, group_texts[0], target_lang, source_lang, engines)
+        else:
+            future = _chunk_executor.submit(_translate_group, group_texts, target_lang, source_lang, engines)
+        futures.append((indexes, len(group_texts) == 1, future))
+    _chunk_counters.incr('groups', len(futures))
+
+    for index, text in oversized:
+        results[index] = _translate_chunked(text, target_lang, source_lang, engines)
+    for indexes, single, future in futures:
+        group_results = [future.result()] if single else future.result()
+        for index, result in zip(indexes, group_results):
+            results[index] = result
+    return results
+
+
+def _split_segments(text):
+    """
+    將文本拆成片段（以行為單位，過長的行再依句尾標點 + 空白拆句）
+    
+    Returns:
+        (segments, separators)，len(separators) == len(segments) - 1，
+        以 segments[0] + separators[0] + segments[1] + ... 可組回原文
+    """
+    parts = []
+    for i, piece in enumerate(_LINE_SPLIT_RE.split(text)):
+        if i % 2:  # 換行分隔符
+            parts.append(piece)
+        elif len(piece) > config.SEGMENT_SENTENCE_MIN_CHARS:
+            parts.extend(_SENTENCE_SPLIT_RE.split(piece))
+        else:
+            parts.append(piece)
+    return parts[0::2], parts[1::2]
+
+
+def _is_passthrough(segment):
+    """空白或純數字的片段不需要翻譯"""
+    stripped = segment.strip().replace(' ', '').replace('.', '').replace(',', '')
+    return not stripped or stripped.isdigit()
+
+
+def _translate_segmented(segments, separators, target_lang, partition, source_lang, engines):
+    """
+    片段快取：逐一查詢各片段的快取，只把未命中的片段合併成一次上游請求
+    
+    Returns:
+        組回後的翻譯結果，任一片段失敗時為 None
+    """
+    results = {}
+    missing = []
+    for segment in dict.fromkeys(segments):  # 去除重複並保持順序
+        if _is_passthrough(segment):
+            results[segment] = segment
+            continue
+        cached = get_translation_cache(segment, target_lang, partition=partition)
+        if cached is not None:
+            results[segment] = cached
+        else:
+            missing.append(segment)
+
+    _segment_counters.incr('messages')
+    _segment_counters.incr('segments', len(segments))
+    _segment_counters.incr('segments_translated', len(missing))
+
+    if missing:
+        print(f"🧩 [片段快取] {len(segments)} 個片段，{len(missing)} 個需要翻譯 -> {target_lang}")
+        for segment, translated in zip(missing, _translate_batch(missing, target_lang, source_lang, engines)):
+            if translated is None:
+                return None
+            results[segment] = translated
+            set_translation_cache(segment, target_lang, translated, partition=partition)
+
+    pieces = [results[segments[0]]]
+    for separator, segment in zip(separators, segments[1:]):
+        pieces.append(separator)
+        pieces.append(results[segment])
+    return ''.join(pieces)
+
+
+def _translate_batch(texts, target_lang, source_lang, engines):
+    """
+    以最少的上游請求翻譯多個片段，依引擎順序處理尚未成功的項目：
+    1. 有批次 API 的引擎（translate_many）：一個請求多個 text，逐筆對應
+    2. 其他引擎：以換行合併成一次請求後再拆回（行數對不上時視為全部失敗）
+    3. 所有引擎後仍失敗的項目，若曾有引擎合併請求成功（只是行數對不上）則逐一翻譯
+    
+    Returns:
+        與 texts 對應的翻譯結果 list，失敗的項目為 None
+    """
+    if len(texts) == 1:
+        if len(texts[0]) > CHUNK_MAX_CHARS:
+            return [_translate_chunked(texts[0], target_lang, source_lang, engines)]
+        return [_translate_single(texts[0], target_lang, source_lang, engines)]
+
+    # 合併後超過單次上限：分組後各組並行翻譯（與 group_by_size 使用相同的大小計算）
+    if joined_size(texts) > CHUNK_MAX_CHARS:
+        return _translate_groups(texts, target_lang, source_lang, engines)
+    return _translate_group(texts, target_lang, source_lang, engines)
+
+
+def _translate_group(texts, target_lang, source_lang, engines):
+    """
+    _translate_batch 的引擎部分：texts 合併後不超過單次上限（呼叫端負責分組），不會用到切塊執行緒池
+    
+    Returns:
+        與 texts 對應的翻譯結果 list，失敗的項目為 None
+    """
+    results = [None] * len(texts)
+    pending = list(range(len(texts)))
+    joined_ok = False
+    for name in engines:
+        batch = [texts[index] for index in pending]
+        if registry.has_batch_api(name):
+            translated = [result for result, _ in _call_engine_many(name, batch, target_lang, source_lang)]
+        else:
+            translated, ok = _call_joined(name, batch, target_lang, source_lang)
+            joined_ok = joined_ok or ok
+        for index, result in zip(pending, translated):
+            results[index] = result
+        pending = [index for index in pending if results[index] is None]
+        if not pending:
+            return results
+
+    if joined_ok:
+        for index in pending:
+            results[index] = _translate_single(texts[index], target_lang, source_lang, engines)
+    return results
+
+
+def _call_joined(name, texts, target_lang, source_lang=None):
+    """
+    沒有批次 API 的引擎：以換行合併成一次請求後再拆回
+    
+    Returns:
+        (與 texts 對應的結果 list, 請求是否成功)；行數對不上時結果全部為 None
+    """
+    translated, reason = _call_engine(name, '\n'.join(texts), target_lang, source_lang)
+    if translated is None:
+        print(f"⚠️ [片段快取] {name} 批次翻譯失敗 ({reason})，語言: {target_lang}")
+        return [None] * len(texts), False
+    parts = translated.split('\n')
+    if len(parts) != len(texts):
+        print(f"⚠️ [片段快取] {name} 回傳 {len(parts)} 行，預期 {len(texts)} 行")
+        return [None] * len(texts), True
+    return parts, True
+
+
+def _dispatch_batch(key, texts):
+    """微批次的處理函數：同一 (目標語言, 來源語言, 引擎順序) 的多則訊息以批次請求翻譯"""
+    target_lang, source_lang, engines = key
+    if len(texts) > 1:
+        print(f"📦 [微批次] {len(texts)} 則訊息合併翻譯 -> {target_lang}")
+    return _translate_batch(texts, target_lang, source_lang, engines)
+
+
+# 尖峰時把不同群組同時送出的單行訊息合併成批次請求（負載低時直接送出）
+_microbatcher = MicroBatcher(
+    'microbatch',
+    _dispatch_batch,
+    window=config.MICROBATCH_WINDOW,
+    max_items=config.MICROBATCH_MAX_ITEMS,
+    min_inflight=config.MICROBATCH_MIN_INFLIGHT,
+)
+
+
+def order_languages(langs):
+    """依 LANGUAGE_MAP 的固定順序排列語言，未列出的語言依代碼排在最後。"""
+    return sorted(set(langs), key=lambda code: (_LANGUAGE_ORDER.get(code, len(_LANGUAGE_ORDER)), code))
+
+
+def translate_languages(translate_fn, text, langs, timeout=None, **kwargs):
+    """
+    將同一段文字同時翻譯成多種語言（使用共用、有上限的執行緒池）。
+    
+    Args:
+        translate_fn: 單一語言翻譯函數，呼叫方式為 translate_fn(text, lang, **kwargs)
+        text: 要翻譯的文本
+        langs: 目標語言集合
+        timeout: 整體期限（秒），預設為 TRANSLATION_FANOUT_TIMEOUT
+        **kwargs: 傳給 translate_fn 的其他參數
+    
+    Returns:
+        依固定語言順序排列的 [(lang, translated), ...]；逾時的語言 translated 為 None
+    """
+    if timeout is None:
+        timeout = config.TRANSLATION_FANOUT_TIMEOUT
+
+    ordered = order_languages(langs)
+    futures = {
+        lang: _fanout_executor.submit(translate_fn, text, lang, **kwargs)
+        for lang in ordered
+    }
+    done, not_done = wait(futures.values(), timeout=timeout)
+    if not_done:
+        print(f"⚠️ [並行翻譯] {len(not_done)}/{len(futures)} 個語言超過 {timeout}s 期限")
+
+    results = []
+    for lang, future in futures.items():
+        if future in done:
+            try:
+                results.append((lang, future.result()))
+            except Exception as e:
+                print(f"❌ [並行翻譯] {lang} 翻譯失敗: {type(e).__name__}: {e}")
+                results.append((lang, "翻譯暫時失敗，請稍後再試"))
+        else:
+            future.cancel()  # 尚未開始的直接取消，已在執行的結果將被忽略
+            results.append((lang, None))
+    return results
+
+
+def is_non_translatable(text, langs, group_id=None):
+    """判斷訊息是否不需翻譯（依群組規則），略過時記錄省下的上游呼叫數"""
+    rules = None
+    if group_id:
+        from services.group_service import get_skip_rules
+        rules = get_skip_rules(group_id)
+    kind = message_classifier.check_message(text, target_count=len(langs), rules=rules)
+    if kind:
+        print(f"⏭️ [略過翻譯] {kind}: {text[:20]}")
+    return kind is not None
+
+
+def skip_source_language(text, langs):
+    """
+    偵測原文語言，並略過與原文相同的目標語言
+    
+    Returns:
+        (source_lang, remaining_langs)；無法判斷時 source_lang 為 None 且不略過任何語言
+    """
+    if not config.LANG_DETECT_ENABLED:
+        return None, list(langs)
+
+    source_lang = detect_language(text)
+    remaining = [lang for lang in langs if lang != source_lang]
+    _detect_counters.incr('messages')
+    if source_lang:
+        _detect_counters.incr('detected')
+        _detect_counters.incr(f'source_{source_lang}')
+        _detect_counters.incr('skipped_targets', len(langs) - len(remaining))
+    return source_lang, remaining
+
+
+def format_translation_results(text, langs, group_id=None, timeout=None, engine_pref=None):
+    """
+    將多語言翻譯結果組成一段文字（略過與原文相同的語言）。
     
     Args:
         text: 要翻譯的文本
         langs: 目標語言集合
         group_id: 群組 ID
+        timeout: 並行模式下的整體期限（秒）
+        engine_pref: 已在呼叫端取得的群組引擎偏好（見 translate_text）
     
     Returns:
-        格式化的翻譯結果
+        格式化的翻譯結果；不需翻譯（表情、網址、笑聲等）或所有目標語言都與原文相同時為空字串（不需回覆）
     """
+    if config.SKIP_NON_TRANSLATABLE and is_non_translatable(text, langs, group_id):
+        return ''
+
+    source_lang, langs = skip_source_language(text, langs)
+    if not langs:
+        return ''
+
+    if config.TRANSLATION_FANOUT_ENABLED and len(langs) > 1:
+        pairs = translate_languages(translate_text, text, langs, timeout=timeout, group_id=group_id,
+                                    source_lang=source_lang, engine_pref=engine_pref)
+    else:
+        pairs = [(lang, translate_text(text, lang, group_id=group_id, source_lang=source_lang,
+                                       engine_pref=engine_pref))
+                 for lang in order_languages(langs)]
+
     results = []
-    for lang in langs:
-        translated = translate_text(text, lang, group_id=group_id)
-        results.append(f"[{lang}] {translated}")
+    for lang, translated in pairs:
+        results.append(f"[{lang}] {translated if translated is not None else FANOUT_TIMEOUT_MESSAGE}")
     return '\n'.join(results)
+
+
+def get_translation_stats():
+    """取得翻譯服務統計（用於 /status）"""
+    return {
+        "coalescing": _inflight.stats(),
+        "segments": _segment_counters.snapshot(),
+        "source_detection": _detect_counters.snapshot(),
+        "non_translatable": message_classifier.get_classifier_stats(),
+        "placeholders": get_placeholder_stats(),
+        "engines": registry.get_registry_stats(),
+        "routing": _route_counters.snapshot(),
+        "negative_cache": {
+            "engine_lang": _lang_negative.stats(),
+            "text": _text_negative.stats(),
+        },
+        "circuit_breakers": {name: breaker.stats() for name, breaker in _breakers.items()},
+        "rate_limits": {name: limiter.stats() for name, limiter in _limiters.items()},
+        "batching": _batch_counters.snapshot(),
+        "microbatch": _microbatcher.stats(),
+        "chunking": _chunk_counters.snapshot(),
+        "timeouts": get_timeout_stats(),
+        "hedging": {
+            "enabled": config.HEDGE_ENABLED,
+            "delay_ms": round(_hedge_delay(registry.engine_names()[0]) * 1000, 1),
+            **_hedge_budget.stats(),
+            **_hedge_counters.snapshot(),
+        },
+    }
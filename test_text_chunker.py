@@ -0,0 +1,71 @@
+"""
+長訊息切塊測試
+驗證切塊 / 分組的大小計算與批次翻譯在單次上限邊界時不會重複分組
+
+執行方式: python -m pytest test_text_chunker.py
+"""
+import os
+import random
+import threading
+
+os.environ.setdefault('PERSISTENT_CACHE_ENABLED', 'false')  # 測試不建立 SQLite 檔案
+
+from services import translation_service
+from translations import registry
+from utils.text_chunker import chunk_text, join_chunks, group_by_size, joined_size
+
+
+class _EchoEngine:
+    """不連線的測試引擎：每行原文加上語言標記"""
+
+    @staticmethod
+    def translate(text, target_lang, source_lang=None):
+        return '\n'.join(f"{line}|{target_lang}" for line in text.split('\n')), 'success'
+
+
+registry.register_engine('test-echo', _EchoEngine)
+
+
+def _run_with_timeout(func, *args, timeout=5):
+    """在另一個執行緒執行，超過 timeout 秒視為卡住"""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', func(*args)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"{func.__name__} 超過 {timeout}s 未回傳"
+    return result['value']
+
+
+def test_chunk_text_round_trip():
+    assert join_chunks(*chunk_text('\n\nHello. World', 5)) == '\n\nHello. World'
+    rng = random.Random(7)
+    alphabet = ['a', 'b', ' ', '\n', '.', '。', '!', '；', '好']
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        limit = rng.randint(1, 20)
+        chunks, separators = chunk_text(text, limit)
+        assert len(chunks) == len(separators)
+        assert join_chunks(chunks, separators) == text
+
+
+def test_group_by_size_matches_joined_size():
+    limit = 50
+    texts = ['a' * n for n in (10, 20, 19, 49, 50, 1, 30, 20)]
+    for group in group_by_size(texts, limit):
+        group_texts = [text for _, text in group]
+        assert len(group_texts) == 1 or joined_size(group_texts) <= limit
+
+
+def test_translate_batch_at_exact_limit():
+    limit = translation_service.CHUNK_MAX_CHARS
+    texts = ['a' * (limit // 2), 'b' * (limit - limit // 2 - 1)]
+    assert joined_size(texts) == limit
+    results = _run_with_timeout(translation_service._translate_batch, texts, 'en', None, ('test-echo',))
+    assert results == [f"{text}|en" for text in texts]
+
+
+def test_translate_batch_just_over_limit():
+    limit = translation_service.CHUNK_MAX_CHARS
+    texts = ['a' * (limit // 2), 'b' * (limit - limit // 2)]
+    results = _run_with_timeout(translation_service._translate_batch, texts, 'en', None, ('test-echo',))
+    assert results == [f"{text}|en" for text in texts]
@@ -0,0 +1,52 @@
+"""
+翻譯工作池測試
+驗證工作依期限排程時，工作函數會收到 deadline（用來縮短自己的翻譯期限）
+
+執行方式: python -m pytest test_worker_pool.py
+"""
+import threading
+import time
+
+from utils.worker_pool import WorkerPool
+
+
+def _submit_and_wait(pool, func, *args, **kwargs):
+    """送出一個工作並等待執行完成"""
+    assert pool.submit(func, *args, **kwargs)
+    pool.queue.join()
+
+
+def test_job_receives_deadline():
+    pool = WorkerPool('test-pool', num_workers=1)
+    received = {}
+
+    def job(text, deadline=None):
+        received.update(text=text, deadline=deadline)
+
+    deadline = time.time() + 5
+    _submit_and_wait(pool, job, 'hi', deadline=deadline)
+    assert received == {'text': 'hi', 'deadline': deadline}
+
+
+def test_job_receives_default_deadline():
+    pool = WorkerPool('test-pool', num_workers=1, max_wait=20)
+    received = {}
+
+    def job(deadline=None):
+        received['deadline'] = deadline
+
+    before = time.time()
+    _submit_and_wait(pool, job)
+    assert before + 20 <= received['deadline'] <= time.time() + 20
+
+
+def test_job_without_deadline_parameter():
+    pool = WorkerPool('test-pool', num_workers=1)
+    called = threading.Event()
+
+    def job(text):
+        assert text == 'hi'
+        called.set()
+
+    _submit_and_wait(pool, job, 'hi', deadline=time.time() + 5)
+    assert called.is_set()
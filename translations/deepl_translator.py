@@ -4,10 +4,27 @@ DeepL translator module - DeepL 翻譯引擎
 import requests
 import time
 import config
+from translations.placeholders import protect_placeholders, protect_for, only_placeholders, restore
+from translations import timeouts
 
 deepl_session = requests.Session()
 DEEPL_SUPPORTED_TARGETS = set()
 
+# 語言代碼轉換：本系統代碼 -> DeepL 目標語言代碼
+DEEPL_TARGET_LANGS = {
+    'en': 'EN', 'ja': 'JA', 'ru': 'RU',
+    'zh-TW': 'ZH-HANT', 'zh-CN': 'ZH-HANS',
+    'de': 'DE', 'fr': 'FR', 'es': 'ES', 'it': 'IT', 'pt': 'PT',
+    'nl': 'NL', 'pl': 'PL', 'ko': 'KO', 'th': 'TH', 'vi': 'VI', 'id': 'ID', 'my': 'MY',
+}
+
+# DeepL 可指定的來源語言（不分繁簡，不支援的語言交給 DeepL 自動偵測）
+DEEPL_SOURCE_LANGS = {
+    'en': 'EN', 'ja': 'JA', 'ru': 'RU', 'ko': 'KO', 'id': 'ID',
+    'zh-TW': 'ZH', 'zh-CN': 'ZH',
+    'de': 'DE', 'fr': 'FR', 'es': 'ES', 'it': 'IT', 'pt': 'PT', 'nl': 'NL', 'pl': 'PL',
+}
+
 
 def load_deepl_supported_languages():
     """啟動時載入 DeepL 支援的目標語言列表"""
@@ -40,13 +57,29 @@ def load_deepl_supported_languages():
         DEEPL_SUPPORTED_TARGETS = {'EN', 'JA', 'RU', 'ZH', 'ZH-HANT', 'ZH-HANS', 'DE', 'FR', 'ES', 'IT', 'PT', 'NL', 'PL', 'KO'}
 
 
-def translate(text, target_lang):
+def supported_languages():
+    """
+    DeepL 支援的目標語言（本系統代碼，供引擎路由使用）
+
+    Returns:
+        語言代碼集合；未設定 API key 時為空集合，尚未載入支援列表時為所有可對應的語言
+    """
+    if not config.DEEPL_API_KEY:
+        return set()
+    if not DEEPL_SUPPORTED_TARGETS:
+        return set(DEEPL_TARGET_LANGS)
+    return {lang for lang, code in DEEPL_TARGET_LANGS.items() if code in DEEPL_SUPPORTED_TARGETS}
+
+
+@protect_placeholders('deepl')
+def translate(text, target_lang, source_lang=None):
     """
     使用 DeepL API 翻譯。
     
     Args:
         text: 要翻譯的文本
         target_lang: 目標語言代碼 (e.g. 'zh-TW', 'en', 'ja')
+        source_lang: 來源語言代碼，None 或 DeepL 不支援時由 DeepL 自動偵測
     
     Returns:
         (translated_text, reason) 其中 reason 是 'success' 或 error_code
@@ -55,33 +88,34 @@ def translate(text, target_lang):
         return None, 'no_api_key'
 
     # 語言代碼轉換
-    lang_map = {
-        'en': 'EN', 'ja': 'JA', 'ru': 'RU',
-        'zh-TW': 'ZH-HANT', 'zh-CN': 'ZH-HANS',
-        'de': 'DE', 'fr': 'FR', 'es': 'ES', 'it': 'IT', 'pt': 'PT',
-        'nl': 'NL', 'pl': 'PL', 'ko': 'KO', 'th': 'TH', 'vi': 'VI', 'id': 'ID', 'my': 'MY',
-    }
-    deepl_target = lang_map.get(target_lang, target_lang.upper())
+    deepl_target = DEEPL_TARGET_LANGS.get(target_lang, target_lang.upper())
     
     # 檢查是否在支援列表中
     if DEEPL_SUPPORTED_TARGETS and deepl_target not in DEEPL_SUPPORTED_TARGETS:
         return None, 'unsupported_language'
 
     url = f"{config.DEEPL_API_BASE_URL.rstrip('/')}/v2/translate"
+    data = {
+        'auth_key': config.DEEPL_API_KEY,
+        'text': text,
+        'target_lang': deepl_target,
+    }
+    deepl_source = DEEPL_SOURCE_LANGS.get(source_lang)
+    if deepl_source:
+        data['source_lang'] = deepl_source
     
     max_retries = config.MAX_TRANSLATION_RETRIES
     for attempt in range(1, max_retries + 1):
+        timeout = timeouts.get_timeout('deepl', target_lang)
+        start = time.monotonic()
         try:
             resp = deepl_session.post(
                 url,
-                data={
-                    'auth_key': config.DEEPL_API_KEY,
-                    'text': text,
-                    'target_lang': deepl_target,
-                },
-                timeout=config.DEEPL_TIMEOUT,
+                data=data,
+                timeout=timeout,
             )
         except requests.Timeout as e:
+            timeouts.record_latency('deepl', target_lang, time.monotonic() - start)
             print(f"⚠️ [DeepL] Timeout (第 {attempt}/{max_retries} 次): {e}")
             if attempt == max_retries:
                 return None, 'timeout'
@@ -94,12 +128,13 @@ def translate(text, target_lang):
             time.sleep(0.1)  # 優化：減少重試等待時間
             continue
 
-        # 處理 429 Too Many Requests
+        # 記錄延遲（用於調整 timeout）
+        timeouts.record_latency('deepl', target_lang, time.monotonic() - start)
+
+        # 處理 429 Too Many Requests：不在工作執行緒中等待重試，
+        # 由 translation_service 降低此引擎的送出速率並改用其他引擎
         if resp.status_code == 429:
             print(f"⚠️ [DeepL] HTTP 429 Too Many Requests (第 {attempt}/{max_retries} 次)")
-            if attempt < max_retries:
-                time.sleep(1)  # 優化：減少 429 等待時間
-                continue
             return None, 'rate_limited'
         
         # 處理其他 HTTP 錯誤
@@ -137,3 +172,107 @@ def translate(text, target_lang):
             continue
     
     return None, 'unknown_error'
+
+
+def translate_many(texts, target_lang, source_lang=None):
+    """
+    使用 DeepL API 一次翻譯多段文字（同一目標語言，一個 POST 帶多個 text 欄位）。
+    超過筆數或大小上限時自動分成多個請求。
+    
+    Args:
+        texts: 要翻譯的文本 list
+        target_lang: 目標語言代碼
+        source_lang: 來源語言代碼，None 或 DeepL 不支援時由 DeepL 自動偵測
+    
+    Returns:
+        與 texts 對應的 [(translated_text, reason), ...]，失敗的項目 translated_text 為 None
+    """
+    if not texts:
+        return []
+    if not config.DEEPL_API_KEY:
+        return [(None, 'no_api_key')] * len(texts)
+
+    deepl_target = DEEPL_TARGET_LANGS.get(target_lang, target_lang.upper())
+    if DEEPL_SUPPORTED_TARGETS and deepl_target not in DEEPL_SUPPORTED_TARGETS:
+        return [(None, 'unsupported_language')] * len(texts)
+
+    results = [None] * len(texts)
+    prepared = []  # (index, protected_text, spans)
+    for index, text in enumerate(texts):
+        protected, spans = protect_for('deepl', text)
+        if spans and only_placeholders(protected):
+            results[index] = (text, 'success')
+        else:
+            prepared.append((index, protected, spans))
+
+    for batch in _pack_batches(prepared):
+        batch_results = _post_batch([protected for _, protected, _ in batch], deepl_target,
+                                    DEEPL_SOURCE_LANGS.get(source_lang), target_lang)
+        for (index, _, spans), (translated, reason) in zip(batch, batch_results):
+            if translated and spans:
+                translated = restore(translated, spans)
+            results[index] = (translated, reason)
+    return results
+
+
+def _pack_batches(items):
+    """依 DEEPL_BATCH_MAX_TEXTS / DEEPL_BATCH_MAX_BYTES 將 (index, text, spans) 分批"""
+    batch, batch_bytes = [], 0
+    for item in items:
+        size = len(item[1].encode('utf-8'))
+        full = len(batch) >= config.DEEPL_BATCH_MAX_TEXTS or batch_bytes + size > config.DEEPL_BATCH_MAX_BYTES
+        if batch and full:
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(item)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _post_batch(texts, deepl_target, deepl_source, target_lang):
+    """送出一個多 text 的請求，回傳與 texts 對應的 [(translated_text, reason), ...]"""
+    url = f"{config.DEEPL_API_BASE_URL.rstrip('/')}/v2/translate"
+    data = [('auth_key', config.DEEPL_API_KEY), ('target_lang', deepl_target)]
+    if deepl_source:
+        data.append(('source_lang', deepl_source))
+    data.extend(('text', text) for text in texts)
+
+    # 批次請求較慢，read timeout 至少使用固定設定值
+    connect_timeout, read_timeout = timeouts.get_timeout('deepl', target_lang)
+    timeout = (connect_timeout, max(read_timeout, config.DEEPL_TIMEOUT[1]))
+
+    def fail(reason):
+        return [(None, reason)] * len(texts)
+
+    try:
+        resp = deepl_session.post(url, data=data, timeout=timeout)
+    except requests.Timeout as e:
+        print(f"⚠️ [DeepL] 批次翻譯 Timeout（{len(texts)} 筆）: {e}")
+        return fail('timeout')
+    except requests.RequestException as e:
+        print(f"⚠️ [DeepL] 批次翻譯網路錯誤（{len(texts)} 筆）: {type(e).__name__}: {e}")
+        return fail('network_error')
+
+    if resp.status_code == 429:
+        print(f"⚠️ [DeepL] 批次翻譯 HTTP 429 Too Many Requests（{len(texts)} 筆）")
+        return fail('rate_limited')
+    if resp.status_code != 200:
+        preview = resp.text[:150] if hasattr(resp, 'text') else ''
+        print(f"⚠️ [DeepL] 批次翻譯 HTTP {resp.status_code}（{len(texts)} 筆）: {preview}")
+        return fail(f'http_{resp.status_code}')
+
+    try:
+        translations = resp.json().get('translations') or []
+    except Exception as e:
+        print(f"⚠️ [DeepL] 批次翻譯 JSON 解析失敗: {type(e).__name__}: {e}")
+        return fail('parse_error')
+    if len(translations) != len(texts):
+        print(f"⚠️ [DeepL] 批次翻譯回傳 {len(translations)} 筆，預期 {len(texts)} 筆")
+        return fail('invalid_response')
+
+    results = []
+    for item in translations:
+        translated_text = item.get('text') if isinstance(item, dict) else None
+        results.append((translated_text, 'success') if translated_text else (None, 'invalid_response'))
+    return results
@@ -3,18 +3,23 @@ Google translator module - Google Translate 翻譯引擎
 """
 import requests
 import time
+from urllib.parse import quote
 import config
+from translations.placeholders import protect_placeholders
+from translations import timeouts
 
 google_session = requests.Session()
 
 
-def translate(text, target_lang):
+@protect_placeholders('google')
+def translate(text, target_lang, source_lang=None):
     """
     使用 Google Translate 非官方 API 翻譯。
     
     Args:
         text: 要翻譯的文本
         target_lang: 目標語言代碼 (e.g. 'zh-TW', 'en', 'ja')
+        source_lang: 來源語言代碼，None 時由 Google 自動偵測
     
     Returns:
         (translated_text, reason) 其中 reason 是 'success' 或 error_code
@@ -22,21 +27,30 @@ def translate(text, target_lang):
     url = config.GOOGLE_TRANSLATE_URL
     params = {
         'client': 'gtx',
-        'sl': 'auto',
+        'sl': source_lang or 'auto',
         'tl': target_lang,
         'dt': 't',
-        'q': text,
     }
+    # 長文字放在 query string 會超過 URL 長度限制，改用 POST 表單送出
+    use_post = len(quote(text)) > config.GOOGLE_POST_THRESHOLD
+    if not use_post:
+        params['q'] = text
     
     max_retries = config.MAX_TRANSLATION_RETRIES
     for attempt in range(1, max_retries + 1):
+        timeout = timeouts.get_timeout('google', target_lang)
+        start = time.monotonic()
         try:
-            res = google_session.get(
-                url,
-                params=params,
-                timeout=config.GOOGLE_TIMEOUT
-            )
+            if use_post:
+                res = google_session.post(url, params=params, data={'q': text}, timeout=timeout)
+            else:
+                res = google_session.get(
+                    url,
+                    params=params,
+                    timeout=timeout
+                )
         except requests.Timeout as e:
+            timeouts.record_latency('google', target_lang, time.monotonic() - start)
             print(f"⚠️ [Google] Timeout (第 {attempt}/{max_retries} 次): {e}")
             if attempt == max_retries:
                 return None, 'timeout'
@@ -49,12 +63,13 @@ def translate(text, target_lang):
             time.sleep(0.1)  # 優化：減少重試等待時間
             continue
 
-        # 處理 429 Too Many Requests
+        # 記錄延遲（用於調整 timeout）
+        timeouts.record_latency('google', target_lang, time.monotonic() - start)
+
+        # 處理 429 Too Many Requests：不在工作執行緒中等待重試，
+        # 由 translation_service 降低此引擎的送出速率並改用其他引擎
         if res.status_code == 429:
             print(f"⚠️ [Google] HTTP 429 Too Many Requests (第 {attempt}/{max_retries} 次)")
-            if attempt < max_retries:
-                time.sleep(1)  # 優化：減少 429 等待時間
-                continue
             return None, 'rate_limited'
         
         # 處理其他 HTTP 錯誤
@@ -66,9 +81,9 @@ def translate(text, target_lang):
             time.sleep(0.1)  # 優化：減少重試等待時間
             continue
 
-        # 解析回應
+        # 解析回應（多句 / 多行時 Google 會拆成多段，需全部串接）
         try:
-            result = res.json()[0][0][0]
+            result = ''.join(part[0] for part in res.json()[0] if part and part[0])
             if result:
                 return result, 'success'
             else:
@@ -0,0 +1,113 @@
+"""
+Placeholder module - 送出翻譯前以佔位符保護網址、@提及與表情符號
+縮短送出的字數（DeepL 依字數計費），翻譯回來後再把原本的內容放回去
+"""
+import functools
+import re
+
+import config
+from utils.message_classifier import URL_RE, MENTION_RE
+from utils.metrics import ThreadLocalCounters
+
+# 連續的表情符號（含膚色、ZWJ 組合與變體選擇符）
+EMOJI_RE = re.compile(
+    r'[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF]'
+    r'[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\u200D\uFE0F]*'
+)
+_PROTECT_RE = re.compile('|'.join(p.pattern for p in (URL_RE, MENTION_RE, EMOJI_RE)), re.IGNORECASE)
+
+# 佔位符 {n}；引擎可能改成全形括號或在中間加空白
+_TOKEN_RE = re.compile(r'[{｛]\s*(\d+)\s*[}｝]')
+
+_counters = ThreadLocalCounters()
+
+
+def protect(text):
+    """
+    以 {0}, {1}, ... 取代網址、@提及與表情符號（只取代比佔位符長的內容，
+    單一表情符號等短內容保留原樣，避免送出的字數反而變多）
+
+    Returns:
+        (protected_text, spans)；原文本身含有 {n} 形式的文字時不處理（spans 為空）
+    """
+    if _TOKEN_RE.search(text):
+        return text, []
+    spans = []
+
+    def replace(match):
+        token = f'{{{len(spans)}}}'
+        if len(match.group(0)) <= len(token):
+            return match.group(0)
+        spans.append(match.group(0))
+        return token
+
+    return _PROTECT_RE.sub(replace, text), spans
+
+
+def restore(translated, spans):
+    """把佔位符換回原本的內容；引擎弄丟的部分附加在最後"""
+    used = set()
+
+    def replace(match):
+        index = int(match.group(1))
+        if index >= len(spans):
+            return match.group(0)
+        used.add(index)
+        return spans[index]
+
+    restored = _TOKEN_RE.sub(replace, translated)
+    missing = [span for i, span in enumerate(spans) if i not in used]
+    if missing:
+        restored = f"{restored} {' '.join(missing)}"
+    return restored
+
+
+def protect_for(engine, text):
+    """
+    protect 並累計該引擎的統計（關閉佔位符保護時原樣回傳）
+
+    Returns:
+        (protected_text, spans)
+    """
+    if not config.PLACEHOLDER_PROTECTION_ENABLED or not text:
+        return text, []
+    protected, spans = protect(text)
+    if spans:
+        _counters.incr(f'{engine}_protected_calls')
+        _counters.incr(f'{engine}_spans', len(spans))
+        _counters.incr(f'{engine}_chars_saved', len(text) - len(protected))
+    return protected, spans
+
+
+def only_placeholders(protected):
+    """保護後只剩佔位符與空白（不需翻譯）"""
+    return not _TOKEN_RE.sub('', protected).strip()
+
+
+def protect_placeholders(engine):
+    """
+    翻譯函數的 decorator：送出前保護特殊內容，回來後還原
+
+    Args:
+        engine: 引擎名稱（用於統計）
+    """
+    def decorator(translate_fn):
+        @functools.wraps(translate_fn)
+        def wrapper(text, target_lang, **kwargs):
+            protected, spans = protect_for(engine, text)
+            if not spans:
+                return translate_fn(text, target_lang, **kwargs)
+            if only_placeholders(protected):
+                return text, 'success'
+
+            translated, reason = translate_fn(protected, target_lang, **kwargs)
+            if not translated:
+                return translated, reason
+            return restore(translated, spans), reason
+        return wrapper
+    return decorator
+
+
+def get_placeholder_stats():
+    """取得佔位符統計（chars_saved 為少送出的字數）"""
+    return _counters.snapshot()
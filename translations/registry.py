@@ -0,0 +1,95 @@
+"""
+Engine registry module - 翻譯引擎註冊表
+引擎是任何提供以下介面的模組或物件：
+- translate(text, target_lang, source_lang=None) -> (translated_text, reason)
+- translate_many(texts, target_lang, source_lang=None) -> [(translated_text, reason), ...]（選用，原生批次 API）
+- supported_languages() -> 支援的目標語言代碼集合，None 表示不限（選用）
+新引擎以 register_engine 註冊後即可被 translation_service 的路由使用
+"""
+import threading
+
+import config
+from translations import google_translator, deepl_translator
+
+_lock = threading.Lock()
+_engines = {}  # name -> 引擎模組 / 物件（依註冊順序）
+_capabilities = {}  # name -> frozenset(語言代碼)，None 表示支援所有語言
+
+
+def register_engine(name, engine):
+    """註冊翻譯引擎（同名時取代），並計算其支援語言"""
+    if not callable(getattr(engine, 'translate', None)):
+        raise TypeError(f"翻譯引擎 {name} 缺少 translate()")
+    with _lock:
+        _engines[name] = engine
+        _capabilities[name] = _load_capabilities(name, engine)
+
+
+def _load_capabilities(name, engine):
+    """呼叫引擎的 supported_languages()，失敗時視為支援所有語言"""
+    supported = getattr(engine, 'supported_languages', None)
+    if supported is None:
+        return None
+    try:
+        langs = supported()
+    except Exception as e:
+        print(f"⚠️ [引擎] 無法取得 {name} 支援的語言: {type(e).__name__}: {e}")
+        return None
+    return frozenset(langs) if langs is not None else None
+
+
+def refresh_capabilities():
+    """重新計算所有引擎的支援語言（例如載入 DeepL 支援語言列表之後）"""
+    with _lock:
+        for name, engine in _engines.items():
+            _capabilities[name] = _load_capabilities(name, engine)
+
+
+def get_engine(name):
+    """取得已註冊的引擎，未註冊時為 None"""
+    return _engines.get(name)
+
+
+def is_registered(name):
+    return name in _engines
+
+
+def engine_names():
+    """預設引擎順序：ENGINE_ORDER 列出的引擎在前，其餘依註冊順序"""
+    names = [name for name in config.ENGINE_ORDER if name in _engines]
+    return names + [name for name in _engines if name not in names]
+
+
+def supports(name, target_lang):
+    """引擎是否支援翻譯成 target_lang"""
+    if name not in _engines:
+        return False
+    langs = _capabilities.get(name)
+    return langs is None or target_lang in langs
+
+
+def has_batch_api(name):
+    """引擎是否提供原生批次 API（translate_many）"""
+    return callable(getattr(_engines.get(name), 'translate_many', None))
+
+
+def get_registry_stats():
+    """取得引擎順序與支援語言矩陣（用於 /status）"""
+    with _lock:
+        capabilities = {
+            name: sorted(langs) if langs is not None else 'all'
+            for name, langs in _capabilities.items()
+        }
+    return {
+        "order": engine_names(),
+        "batch_api": [name for name in _engines if has_batch_api(name)],
+        "capabilities": capabilities,
+    }
+
+
+# 內建引擎
+register_engine('google', google_translator)
+register_engine('deepl', deepl_translator)
+if config.STUB_ENGINE_ENABLED:
+    from translations import stub_translator
+    register_engine('stub', stub_translator)
@@ -0,0 +1,32 @@
+"""
+Stub translator module - 本機測試用翻譯引擎（不連線）
+回傳原文加上目標語言標記，用於在沒有網路或 API key 的環境測試路由、批次與快取流程
+（STUB_ENGINE_ENABLED=true 時註冊為 stub，可用 ENGINE_ORDER=stub 或群組偏好指定）
+"""
+import time
+
+import config
+
+
+def translate(text, target_lang, source_lang=None):
+    """
+    模擬翻譯
+
+    Returns:
+        (translated_text, reason)
+    """
+    if config.STUB_ENGINE_LATENCY:
+        time.sleep(config.STUB_ENGINE_LATENCY)
+    return f"{text} ({target_lang})", 'success'
+
+
+def translate_many(texts, target_lang, source_lang=None):
+    """模擬批次翻譯（一次延遲，逐筆對應）"""
+    if config.STUB_ENGINE_LATENCY:
+        time.sleep(config.STUB_ENGINE_LATENCY)
+    return [(f"{text} ({target_lang})", 'success') for text in texts]
+
+
+def supported_languages():
+    """支援所有語言"""
+    return None
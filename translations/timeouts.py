@@ -0,0 +1,88 @@
+"""
+Adaptive timeouts module - 依實際延遲自動調整翻譯引擎的 timeout
+每個 (引擎, 目標語言) 以 LatencySketch 追蹤延遲分布：
+- read timeout = 該語言延遲 p99 × 倍數（樣本不足時用引擎整體，再不足用 config 的固定值）
+- connect timeout = 引擎整體延遲中位數 × 倍數（連線多半重用，無法單獨量測連線時間）
+兩者都限制在 config 設定的上下限之間
+"""
+import threading
+
+import config
+from utils.metrics import LatencySketch
+
+_sketches = {}  # (engine, lang) -> LatencySketch，lang 為 None 表示引擎整體
+_sketches_lock = threading.Lock()
+_chosen = {}  # (engine, lang) -> 最近一次採用的 (connect, read)
+
+_DEFAULTS = {
+    'google': lambda: config.GOOGLE_TIMEOUT,
+    'deepl': lambda: config.DEEPL_TIMEOUT,
+}
+_BOUNDS = {
+    'google': lambda: config.GOOGLE_TIMEOUT_BOUNDS,
+    'deepl': lambda: config.DEEPL_TIMEOUT_BOUNDS,
+}
+
+
+def _sketch(engine, lang):
+    key = (engine, lang)
+    sketch = _sketches.get(key)
+    if sketch is None:
+        with _sketches_lock:
+            sketch = _sketches.setdefault(key, LatencySketch())
+    return sketch
+
+
+def record_latency(engine, lang, seconds):
+    """記錄一次上游呼叫的延遲（逾時也要記錄，延遲即為當時的 timeout）"""
+    _sketch(engine, lang).record(seconds)
+    _sketch(engine, None).record(seconds)
+
+
+def _clamp(value, bounds):
+    low, high = bounds
+    return round(min(high, max(low, value)), 2)
+
+
+def get_timeout(engine, lang):
+    """
+    取得 requests 使用的 (connect_timeout, read_timeout)
+
+    Args:
+        engine: 'google' 或 'deepl'
+        lang: 目標語言代碼
+    """
+    default = _DEFAULTS[engine]()
+    if not config.ADAPTIVE_TIMEOUT_ENABLED:
+        return default
+
+    engine_sketch = _sketch(engine, None)
+    if engine_sketch.weight() < config.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+        return default
+
+    lang_sketch = _sketch(engine, lang)
+    read_source = lang_sketch if lang_sketch.weight() >= config.ADAPTIVE_TIMEOUT_MIN_SAMPLES else engine_sketch
+    connect_bounds, read_bounds = _BOUNDS[engine]()
+    timeout = (
+        _clamp(engine_sketch.quantile(0.5) * config.ADAPTIVE_TIMEOUT_MULTIPLIER, connect_bounds),
+        _clamp(read_source.quantile(config.ADAPTIVE_TIMEOUT_QUANTILE) * config.ADAPTIVE_TIMEOUT_MULTIPLIER,
+               read_bounds),
+    )
+    _chosen[(engine, lang)] = timeout
+    return timeout
+
+
+def get_timeout_stats():
+    """取得各 (引擎, 語言) 的延遲分位數與目前採用的 timeout（供稽核）"""
+    with _sketches_lock:
+        items = list(_sketches.items())
+    stats = {}
+    for (engine, lang), sketch in sorted(items, key=lambda item: (item[0][0], item[0][1] or '')):
+        p50, p99 = sketch.quantile(0.5), sketch.quantile(0.99)
+        stats[f"{engine}:{lang or '*'}"] = {
+            "samples": round(sketch.weight(), 1),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "timeout": _chosen.get((engine, lang), _DEFAULTS[engine]()) if lang else None,
+        }
+    return stats
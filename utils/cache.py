@@ -1,101 +1,762 @@
 """
 Cache module - 高效快取層
 用於加快翻譯、群組設定等常用查詢
+
+CACHE_BACKEND:
+- local: 每個行程各自的記憶體快取（翻譯可再加本機持久化 L2）
+- shared: 同一台主機的所有 gunicorn worker 共用 SQLite（WAL）檔案
 """
 from collections import OrderedDict
+import hashlib
+import json
+import re
+import sys
+import threading
 import time
+import unicodedata
 import config
+from utils.persistent_cache import SQLiteCache
+from utils.metrics import ThreadLocalCounters
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+# 每筆 entry 的固定額外開銷（tuple + OrderedDict 節點，估計值）
+ENTRY_OVERHEAD_BYTES = 100
+
+
+def estimate_size(obj):
+    """估計物件佔用的記憶體位元組數（容器會遞迴計算內容）"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in obj)
+    return size
+
+
+def _format_cache_stats(counters):
+    """將原始計數整理成 /status 用的統計"""
+    lookups = counters["hits"] + counters["misses"]
+    evictions = counters["evictions"]
+    return {
+        "hits": counters["hits"],
+        "misses": counters["misses"],
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        "expirations": counters["expirations"],
+        "evictions": evictions,
+        "inserts": counters["inserts"],
+        "avg_evicted_age_s": round(counters["evicted_age_total"] / evictions, 1) if evictions else 0.0,
+    }
 
 
 class LRUCache:
-    """簡單的 LRU 快取實現"""
+    """執行緒安全的 LRU 快取實現（值與過期時間存在同一筆 entry，每次操作只查一次 dict）"""
     
-    def __init__(self, max_size=1000, ttl=3600):
+    def __init__(self, max_size=1000, ttl=3600, max_bytes=None):
         """
         Args:
             max_size: 最多儲存記錄數
             ttl: 過期時間（秒）
+            max_bytes: 最多使用的記憶體位元組數（key + value 估計值），None 表示不限制
         """
         self.max_size = max_size
         self.ttl = ttl
-        self.cache = OrderedDict()  # 維持插入順序
-        self.timestamps = {}  # 記錄插入時間
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.cache = OrderedDict()  # key -> (value, expires_at, nbytes)，維持 LRU 順序
+        self.lock = threading.Lock()
+        self.on_remove = None  # entry 被淘汰 / 過期 / 刪除時呼叫 on_remove(key)（在 lock 內）
+        
+        # 統計（在已持有的 lock 內累加，不需額外同步）
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.inserts = 0
+        self.evicted_age_total = 0.0  # 被淘汰 entry 的存活時間總和（秒）
     
     def get(self, key):
         """取得快取值，若過期返回 None"""
-        if key not in self.cache:
-            return None
-        
-        # 檢查是否過期
-        if time.time() - self.timestamps.get(key, 0) > self.ttl:
-            del self.cache[key]
-            del self.timestamps[key]
-            return None
-        
-        # 移到最後（LRU）
-        self.cache.move_to_end(key)
-        return self.cache[key]
+        now = time.monotonic()
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            # 檢查是否過期
+            if entry[1] < now:
+                del self.cache[key]
+                self.bytes_used -= entry[2]
+                self.expirations += 1
+                self.misses += 1
+                if self.on_remove is not None:
+                    self.on_remove(key)
+                return None
+            
+            # 移到最後（LRU）
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
     
     def set(self, key, value):
         """設定快取值"""
-        if key in self.cache:
-            del self.cache[key]
+        expires_at = time.monotonic() + self.ttl
+        nbytes = estimate_size(key) + estimate_size(value) + ENTRY_OVERHEAD_BYTES
+        with self.lock:
+            old = self.cache.pop(key, None)
+            if old is not None:
+                self.bytes_used -= old[2]
+            
+            # 單筆就超過記憶體上限的不快取
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                if old is not None and self.on_remove is not None:
+                    self.on_remove(key)
+                return
+            
+            self.cache[key] = (value, expires_at, nbytes)
+            self.bytes_used += nbytes
+            self.inserts += 1
+            
+            # 超出筆數或記憶體限制時刪除最舊的
+            while len(self.cache) > self.max_size or \
+                    (self.max_bytes is not None and self.bytes_used > self.max_bytes):
+                evicted_key, evicted = self.cache.popitem(last=False)
+                self.bytes_used -= evicted[2]
+                self.evictions += 1
+                self.evicted_age_total += expires_at - evicted[1]  # 兩者 ttl 相同，差值即存活時間
+                if self.on_remove is not None:
+                    self.on_remove(evicted_key)
+    
+    def delete(self, key):
+        """刪除單筆快取"""
+        with self.lock:
+            entry = self.cache.pop(key, None)
+            if entry is not None:
+                self.bytes_used -= entry[2]
+                if self.on_remove is not None:
+                    self.on_remove(key)
+
+    def clear(self):
+        """清空快取"""
+        with self.lock:
+            if self.on_remove is not None:
+                for key in self.cache:
+                    self.on_remove(key)
+            self.cache.clear()
+            self.bytes_used = 0
+    
+    def size(self):
+        """返回當前快取大小"""
+        return len(self.cache)
+    
+    def __contains__(self, key):
+        return key in self.cache
+    
+    def memory_bytes(self):
+        """返回目前使用的記憶體位元組數（估計值）"""
+        return self.bytes_used
+    
+    def counters(self):
+        """返回原始計數（供彙總用）"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "inserts": self.inserts,
+            "evicted_age_total": self.evicted_age_total,
+        }
+    
+    def stats(self):
+        """返回命中率、淘汰數等統計"""
+        return _format_cache_stats(self.counters())
+
+
+# bytearray.translate 用的對照表：每個計數減半
+_HALVE_TABLE = bytes(i >> 1 for i in range(256))
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch 頻率估計（4 列、每格上限 15），
+    累計次數達 sample_size 後所有計數減半，讓舊的熱門資料逐漸退場
+    """
+    
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+    
+    def __init__(self, capacity):
+        width = 1
+        while width < max(16, capacity):
+            width <<= 1
+        self.mask = width - 1
+        self.table = [bytearray(width) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * max(1, capacity)
+        self.additions = 0
+    
+    def _indexes(self, key):
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return [((h ^ seed) * 0x9E3779B97F4A7C15 >> 40) & self.mask for seed in self.SEEDS]
+    
+    def increment(self, key):
+        """記錄一次存取"""
+        added = False
+        for row, index in zip(self.table, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._reset()
+    
+    def frequency(self, key):
+        """估計存取次數"""
+        return min(row[index] for row, index in zip(self.table, self._indexes(key)))
+    
+    def _reset(self):
+        """所有計數減半"""
+        for row in self.table:
+            row[:] = row.translate(_HALVE_TABLE)
+        self.additions //= 2
+
+
+class TinyLFUCache:
+    """
+    W-TinyLFU 快取（介面與 LRUCache 相同）：
+    新資料先進入小型 window LRU（1%），被擠出時要比 main 區最舊的資料
+    存取頻率更高才會被接納；main 區分為 probation（20%）與 protected（80%），
+    再次命中才升級到 protected。一次性的大量訊息不會把常用語句擠出快取。
+    """
+    
+    def __init__(self, max_size=1000, ttl=3600, max_bytes=None):
+        """
+        Args:
+            max_size: 最多儲存記錄數
+            ttl: 過期時間（秒）
+            max_bytes: 最多使用的記憶體位元組數（key + value 估計值），None 表示不限制
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.window_size = max(1, max_size // 100)
+        self.main_size = max(1, max_size - self.window_size)
+        self.protected_size = max(1, self.main_size * 8 // 10)
+        # 各區 key -> (value, expires_at, nbytes)，維持 LRU 順序
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(max_size)
+        self.lock = threading.Lock()
+        self.on_remove = None  # entry 被淘汰 / 過期 / 刪除時呼叫 on_remove(key)（在 lock 內）
         
-        self.cache[key] = value
-        self.timestamps[key] = time.time()
-        self.cache.move_to_end(key)
+        # 統計
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.inserts = 0
+        self.evicted_age_total = 0.0
+    
+    def _region(self, key):
+        for region in (self.window, self.probation, self.protected):
+            if key in region:
+                return region
+        return None
+    
+    def _evict(self, region, now, key=None):
+        """從指定區域淘汰一筆（預設為最舊的）"""
+        if key is None:
+            key, entry = region.popitem(last=False)
+        else:
+            entry = region.pop(key)
+        self.bytes_used -= entry[2]
+        self.evictions += 1
+        self.evicted_age_total += now - (entry[1] - self.ttl)
+        if self.on_remove is not None:
+            self.on_remove(key)
+    
+    def get(self, key):
+        """取得快取值，若過期返回 None"""
+        now = time.monotonic()
+        with self.lock:
+            self.sketch.increment(key)
+            region = self._region(key)
+            if region is None:
+                self.misses += 1
+                return None
+            
+            entry = region[key]
+            if entry[1] < now:
+                del region[key]
+                self.bytes_used -= entry[2]
+                self.expirations += 1
+                self.misses += 1
+                if self.on_remove is not None:
+                    self.on_remove(key)
+                return None
+            
+            if region is self.probation:
+                # 再次命中：升級到 protected，protected 滿了就把最舊的降回 probation
+                del self.probation[key]
+                self.protected[key] = entry
+                if len(self.protected) > self.protected_size:
+                    demoted_key, demoted = self.protected.popitem(last=False)
+                    self.probation[demoted_key] = demoted
+            else:
+                region.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def set(self, key, value):
+        """設定快取值"""
+        now = time.monotonic()
+        nbytes = estimate_size(key) + estimate_size(value) + ENTRY_OVERHEAD_BYTES
+        with self.lock:
+            region = self._region(key)
+            if region is not None:
+                old = region[key]
+                self.bytes_used += nbytes - old[2]
+                region[key] = (value, now + self.ttl, nbytes)
+                region.move_to_end(key)
+                self.inserts += 1  # 與 LRUCache 相同：每次寫入都計入（含覆寫）
+            else:
+                if self.max_bytes is not None and nbytes > self.max_bytes:
+                    return
+                self.window[key] = (value, now + self.ttl, nbytes)
+                self.bytes_used += nbytes
+                self.inserts += 1
+                if len(self.window) > self.window_size:
+                    self._admit(now)
+            
+            # 超出記憶體限制時依 probation -> protected -> window 順序淘汰
+            while self.max_bytes is not None and self.bytes_used > self.max_bytes:
+                for victim_region in (self.probation, self.protected, self.window):
+                    if victim_region:
+                        self._evict(victim_region, now)
+                        break
+    
+    def _admit(self, now):
+        """window 擠出的資料與 main 區最舊的資料比較頻率，決定誰留下"""
+        candidate_key, candidate = self.window.popitem(last=False)
+        if len(self.probation) + len(self.protected) < self.main_size:
+            self.probation[candidate_key] = candidate
+            return
         
-        # 超出大小限制時刪除最舊的
-        if len(self.cache) > self.max_size:
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-            del self.timestamps[oldest_key]
+        victim_region = self.probation if self.probation else self.protected
+        victim_key = next(iter(victim_region))
+        if self.sketch.frequency(candidate_key) > self.sketch.frequency(victim_key):
+            self._evict(victim_region, now, victim_key)
+            self.probation[candidate_key] = candidate
+        else:
+            # 候選者頻率不夠高，直接淘汰
+            self.bytes_used -= candidate[2]
+            self.evictions += 1
+            self.evicted_age_total += now - (candidate[1] - self.ttl)
+            if self.on_remove is not None:
+                self.on_remove(candidate_key)
+    
+    def delete(self, key):
+        """刪除單筆快取"""
+        with self.lock:
+            region = self._region(key)
+            if region is not None:
+                self.bytes_used -= region.pop(key)[2]
+                if self.on_remove is not None:
+                    self.on_remove(key)
     
     def clear(self):
         """清空快取"""
-        self.cache.clear()
-        self.timestamps.clear()
+        with self.lock:
+            if self.on_remove is not None:
+                for region in (self.window, self.probation, self.protected):
+                    for key in region:
+                        self.on_remove(key)
+            self.window.clear()
+            self.probation.clear()
+            self.protected.clear()
+            self.bytes_used = 0
     
     def size(self):
         """返回當前快取大小"""
-        return len(self.cache)
+        return len(self.window) + len(self.probation) + len(self.protected)
+    
+    def __contains__(self, key):
+        return self._region(key) is not None
+    
+    def memory_bytes(self):
+        """返回目前使用的記憶體位元組數（估計值）"""
+        return self.bytes_used
+    
+    def counters(self):
+        """返回原始計數（供彙總用）"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "inserts": self.inserts,
+            "evicted_age_total": self.evicted_age_total,
+        }
+    
+    def stats(self):
+        """返回命中率、淘汰數等統計"""
+        return _format_cache_stats(self.counters())
+
 
+# 可選的淘汰策略
+CACHE_POLICIES = {
+    'lru': LRUCache,
+    'tinylfu': TinyLFUCache,
+}
 
-# 翻譯結果快取
-translation_cache = LRUCache(
-    max_size=config.TRANSLATION_CACHE_SIZE,
-    ttl=config.TRANSLATION_CACHE_TTL
+
+class StripedLRUCache:
+    """
+    分段鎖快取：依 key 的 hash 分散到多個分段（LRUCache 或 TinyLFUCache），
+    不同分段的讀寫互不阻塞（介面與 LRUCache 相同）
+    """
+    
+    def __init__(self, max_size=1000, ttl=3600, stripes=16, max_bytes=None, policy='lru'):
+        """
+        Args:
+            max_size: 最多儲存記錄數（平均分配到各分段）
+            ttl: 過期時間（秒）
+            stripes: 分段數量
+            max_bytes: 最多使用的記憶體位元組數（平均分配到各分段），None 表示不限制
+            policy: 淘汰策略，'lru' 或 'tinylfu'
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        per_segment = max(1, -(-max_size // stripes))  # 無條件進位
+        per_segment_bytes = max_bytes // stripes if max_bytes is not None else None
+        segment_cls = CACHE_POLICIES[policy]
+        self.policy = policy
+        self.segments = [segment_cls(max_size=per_segment, ttl=ttl, max_bytes=per_segment_bytes)
+                         for _ in range(stripes)]
+    
+    def _segment(self, key):
+        return self.segments[hash(key) % len(self.segments)]
+    
+    def get(self, key):
+        """取得快取值，若過期返回 None"""
+        return self._segment(key).get(key)
+    
+    def set(self, key, value):
+        """設定快取值"""
+        self._segment(key).set(key, value)
+    
+    def delete(self, key):
+        """刪除單筆快取"""
+        self._segment(key).delete(key)
+    
+    def clear(self):
+        """清空快取"""
+        for segment in self.segments:
+            segment.clear()
+    
+    def size(self):
+        """返回當前快取大小"""
+        return sum(segment.size() for segment in self.segments)
+    
+    def memory_bytes(self):
+        """返回目前使用的記憶體位元組數（估計值）"""
+        return sum(segment.memory_bytes() for segment in self.segments)
+    
+    def counters(self):
+        """返回各分段加總後的原始計數"""
+        totals = {}
+        for segment in self.segments:
+            for name, value in segment.counters().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+    
+    def stats(self):
+        """返回命中率、淘汰數等統計"""
+        return _format_cache_stats(self.counters())
+
+
+class _QuotaShard:
+    """單一快取分段的分區記錄（有自己的 lock，分段淘汰 / 過期 / 刪除資料時同步移除記錄）"""
+    
+    def __init__(self):
+        self.partitions = {}  # partition -> OrderedDict(key -> None)，維持分區內 LRU 順序
+        self.owners = {}  # key -> set(partition)
+        self.lock = threading.Lock()
+    
+    def forget(self, key):
+        """資料已離開快取：從所有持有的分區移除（分段的 on_remove，在分段 lock 內呼叫）"""
+        with self.lock:
+            for partition in self.owners.pop(key, ()):
+                keys = self.partitions.get(partition)
+                if keys is not None:
+                    keys.pop(key, None)
+                    if not keys:
+                        del self.partitions[partition]
+
+
+class PartitionQuota:
+    """
+    在共用快取之上為每個分區（群組或租戶）設定軟性配額：
+    快取接近滿載時，超過配額的分區先淘汰自己最舊的資料，不會擠掉其他分區。
+    同一筆資料只存一份，多個分區使用時共同持有，全部分區都釋放後才真正刪除。
+    分區記錄依快取分段拆開（配額平均分到各分段），與分段鎖快取一樣互不阻塞；
+    快取自行淘汰或過期的資料會同步移除記錄，記錄數量不會超過快取本身。
+    """
+    
+    def __init__(self, cache, default_quota, pressure=0.9):
+        """
+        Args:
+            cache: 被管理的快取（StripedLRUCache，或有 delete、size、max_size 與 on_remove 的單一快取）
+            default_quota: 預設每個分區最多持有的記錄數
+            pressure: 分段使用率達到此比例才開始執行配額
+        """
+        self.cache = cache
+        self.default_quota = default_quota
+        self.pressure = pressure
+        self.segments = getattr(cache, 'segments', None) or [cache]
+        self.shards = [_QuotaShard() for _ in self.segments]
+        for segment, shard in zip(self.segments, self.shards):
+            segment.on_remove = shard.forget
+        self.quota_evictions = 0
+    
+    def touch(self, partition, key, quota=None):
+        """
+        記錄分區使用了某筆資料（寫入或命中後呼叫）
+        
+        Args:
+            partition: 分區 ID
+            key: 快取 key
+            quota: 此分區的配額，None 表示使用預設值
+        """
+        if quota is None:
+            quota = self.default_quota
+        index = hash(key) % len(self.segments)  # 與 StripedLRUCache._segment 相同
+        segment, shard = self.segments[index], self.shards[index]
+        shard_quota = max(1, -(-quota // len(self.segments)))
+        under_pressure = segment.size() >= segment.max_size * self.pressure
+        released = []
+        with shard.lock:
+            shard.owners.setdefault(key, set()).add(partition)
+            keys = shard.partitions.setdefault(partition, OrderedDict())
+            keys[key] = None
+            keys.move_to_end(key)
+            
+            # 超過配額時釋放此分區最舊的資料
+            while under_pressure and len(keys) > shard_quota:
+                old_key, _ = keys.popitem(last=False)
+                owners = shard.owners.get(old_key)
+                if owners is not None:
+                    owners.discard(partition)
+                    if not owners:
+                        del shard.owners[old_key]
+                        released.append(old_key)
+        
+        # 記錄之前資料就已被淘汰（或沒有寫入）時不保留記錄
+        if key not in segment:
+            shard.forget(key)
+        for old_key in released:
+            segment.delete(old_key)
+        if released:
+            self.quota_evictions += len(released)
+    
+    def clear(self):
+        """清空所有分區記錄"""
+        for shard in self.shards:
+            with shard.lock:
+                shard.partitions.clear()
+                shard.owners.clear()
+    
+    def tracked_keys(self):
+        """目前有分區記錄的資料筆數"""
+        return sum(len(shard.owners) for shard in self.shards)
+    
+    def stats(self):
+        """取得分區統計"""
+        usage = {}
+        for shard in self.shards:
+            with shard.lock:
+                for partition, keys in shard.partitions.items():
+                    usage[partition] = usage.get(partition, 0) + len(keys)
+        top = sorted(((count, partition) for partition, count in usage.items()), reverse=True)[:5]
+        return {
+            "partitions": len(usage),
+            "tracked_keys": self.tracked_keys(),
+            "quota_evictions": self.quota_evictions,
+            "top_partitions": {partition: count for count, partition in top},
+        }
+
+
+SHARED_BACKEND = config.CACHE_BACKEND == 'shared'
+
+# 翻譯結果快取（L1；shared 模式下只保留少量熱門資料，其餘放共用檔案）
+translation_cache = StripedLRUCache(
+    max_size=config.SHARED_CACHE_L1_SIZE if SHARED_BACKEND else config.TRANSLATION_CACHE_SIZE,
+    ttl=config.TRANSLATION_CACHE_TTL,
+    stripes=config.CACHE_LOCK_STRIPES,
+    max_bytes=config.TRANSLATION_CACHE_MAX_BYTES,
+    policy=config.TRANSLATION_CACHE_POLICY
 )
 
+# 翻譯快取的群組 / 租戶配額
+translation_quota = PartitionQuota(
+    translation_cache,
+    default_quota=config.CACHE_PARTITION_QUOTA,
+)
+
+# 翻譯快取 L2，L1 未命中時查詢
+if SHARED_BACKEND:
+    persistent_cache = SQLiteCache(
+        config.SHARED_CACHE_PATH,
+        table='translation',
+        ttl=config.PERSISTENT_CACHE_TTL,
+        max_rows=config.PERSISTENT_CACHE_MAX_ROWS,
+        flush_interval=config.PERSISTENT_CACHE_FLUSH_INTERVAL,
+        batch_size=config.PERSISTENT_CACHE_BATCH_SIZE,
+        maintenance_interval=config.PERSISTENT_CACHE_MAINTENANCE_INTERVAL,
+    )
+elif config.PERSISTENT_CACHE_ENABLED:
+    persistent_cache = SQLiteCache(
+        config.PERSISTENT_CACHE_PATH,
+        ttl=config.PERSISTENT_CACHE_TTL,
+        max_rows=config.PERSISTENT_CACHE_MAX_ROWS,
+        flush_interval=config.PERSISTENT_CACHE_FLUSH_INTERVAL,
+        batch_size=config.PERSISTENT_CACHE_BATCH_SIZE,
+        maintenance_interval=config.PERSISTENT_CACHE_MAINTENANCE_INTERVAL,
+    )
+else:
+    persistent_cache = None
+
 # 群組語言設定快取
-group_langs_cache = LRUCache(
+group_langs_cache = StripedLRUCache(
+    max_size=500,
+    ttl=config.GROUP_LANGS_CACHE_TTL,
+    stripes=config.CACHE_LOCK_STRIPES,
+    max_bytes=config.GROUP_LANGS_CACHE_MAX_BYTES
+)
+
+# 選單快取
+menu_cache = LRUCache(
     max_size=500,
-    ttl=config.GROUP_LANGS_CACHE_TTL
+    ttl=config.MENU_CACHE_TTL,
+    max_bytes=config.MENU_CACHE_MAX_BYTES
 )
 
+# shared 模式下群組設定與選單直接讀寫共用檔案（立即寫入，其他 worker 馬上看得到更新）
+if SHARED_BACKEND:
+    shared_group_langs_cache = SQLiteCache(
+        config.SHARED_CACHE_PATH, table='group_langs', ttl=config.GROUP_LANGS_CACHE_TTL, write_behind=False,
+        maintenance_interval=config.PERSISTENT_CACHE_MAINTENANCE_INTERVAL)
+    shared_menu_cache = SQLiteCache(
+        config.SHARED_CACHE_PATH, table='menu', ttl=config.MENU_CACHE_TTL, write_behind=False,
+        maintenance_interval=config.PERSISTENT_CACHE_MAINTENANCE_INTERVAL)
+else:
+    shared_group_langs_cache = None
+    shared_menu_cache = None
+
+# 翻譯快取各目標語言的命中 / 未命中次數（含 L2）
+translation_lang_counters = ThreadLocalCounters()
+
 # 租戶快取（長期）
 tenant_cache = LRUCache(
     max_size=200,
-    ttl=1800  # 30 分鐘
+    ttl=1800,  # 30 分鐘
+    max_bytes=config.TENANT_CACHE_MAX_BYTES
+)
+
+# 群組略過翻譯規則快取
+skip_rules_cache = LRUCache(
+    max_size=500,
+    ttl=600,  # 10 分鐘
+    max_bytes=config.SKIP_RULES_CACHE_MAX_BYTES
 )
 
+# 群組翻譯引擎偏好快取
+engine_pref_cache = LRUCache(
+    max_size=500,
+    ttl=600,  # 10 分鐘
+    max_bytes=config.ENGINE_PREF_CACHE_MAX_BYTES
+)
+
+
+def normalize_text(text):
+    """
+    正規化原文：Unicode NFKC、去除每行首尾空白並合併連續空白；
+    開啟 TRANSLATION_CACHE_CASEFOLD 時，只含 ASCII / 西里爾字母的文字再轉為小寫
+    """
+    text = unicodedata.normalize('NFKC', text)
+    lines = [_SPACES_RE.sub(' ', line).strip() for line in text.splitlines()]
+    text = '\n'.join(line for line in lines if line)
+    if config.TRANSLATION_CACHE_CASEFOLD and _casefold_safe(text):
+        text = text.lower()
+    return text
+
+
+def _casefold_safe(text):
+    """大小寫不影響語意的文字才轉小寫（僅限 ASCII 與基本西里爾字母）"""
+    return all(c.isascii() or '\u0400' <= c <= '\u04ff' for c in text if c.isalpha())
+
+
+def translation_cache_key(text, target_lang, normalized=None):
+    """
+    由原文與目標語言產生固定長度的快取 key
+    
+    Args:
+        text: 原文
+        target_lang: 目標語言代碼
+        normalized: 已正規化的原文（省略時自動計算）
+    
+    Returns:
+        "<語言>:<128-bit blake2b hex>"，開啟驗證模式時加上 ":v"
+    """
+    if normalized is None:
+        normalized = normalize_text(text)
+    digest = hashlib.blake2b(f"{target_lang}\x00{normalized}".encode('utf-8'), digest_size=16).hexdigest()
+    suffix = ':v' if config.TRANSLATION_CACHE_VERIFY else ''
+    return f"{target_lang}:{digest}{suffix}"
+
 
-def get_translation_cache(text, target_lang):
+def get_translation_cache(text, target_lang, partition=None):
     """
-    取得翻譯快取
+    取得翻譯快取（先查記憶體 L1，未命中再查持久化 L2 並回填 L1）
     
     Args:
         text: 原文
         target_lang: 目標語言代碼
+        partition: (分區 ID, 配額)，命中時計入該分區使用量；None 表示不分區
     
     Returns:
         翻譯結果或 None
     """
-    key = f"{text}|{target_lang}"
-    return translation_cache.get(key)
+    normalized = normalize_text(text)
+    key = translation_cache_key(text, target_lang, normalized)
+    value = translation_cache.get(key)
+    if value is None and persistent_cache is not None:
+        value = persistent_cache.get(key)
+        if value is not None and config.TRANSLATION_CACHE_VERIFY:
+            value = tuple(json.loads(value))
+        if value is not None:
+            translation_cache.set(key, value)
 
+    if value is not None and config.TRANSLATION_CACHE_VERIFY:
+        # 驗證模式：確認原文相同，避免 hash 碰撞取到別的翻譯
+        source, value = value
+        if source != normalized:
+            print(f"⚠️ [快取] key 碰撞: {key}")
+            value = None
 
-def set_translation_cache(text, target_lang, translated_text):
+    translation_lang_counters.incr((target_lang, 'hits' if value is not None else 'misses'))
+    if value is not None and partition is not None:
+        translation_quota.touch(partition[0], key, partition[1])
+    return value
+
+
+def set_translation_cache(text, target_lang, translated_text, partition=None):
     """
     設定翻譯快取
     
@@ -103,31 +764,158 @@ def set_translation_cache(text, target_lang, translated_text):
         text: 原文
         target_lang: 目標語言代碼
         translated_text: 翻譯結果
+        partition: (分區 ID, 配額)，寫入量計入該分區；None 表示不分區
     """
-    key = f"{text}|{target_lang}"
-    translation_cache.set(key, translated_text)
+    normalized = normalize_text(text)
+    key = translation_cache_key(text, target_lang, normalized)
+    if config.TRANSLATION_CACHE_VERIFY:
+        translation_cache.set(key, (normalized, translated_text))
+        if persistent_cache is not None:
+            persistent_cache.set(key, json.dumps([normalized, translated_text], ensure_ascii=False))
+    else:
+        translation_cache.set(key, translated_text)
+        if persistent_cache is not None:
+            persistent_cache.set(key, translated_text)
+    if partition is not None:
+        translation_quota.touch(partition[0], key, partition[1])
+
+
+def flush_persistent_cache():
+    """立即寫入持久化快取中尚未寫入的資料（重啟前呼叫）"""
+    if persistent_cache is not None:
+        persistent_cache.flush()
 
 
 def get_group_langs_cache(group_id):
     """取得群組語言設定快取"""
+    if shared_group_langs_cache is not None:
+        raw = shared_group_langs_cache.get(group_id)
+        return set(json.loads(raw)) if raw is not None else None
     return group_langs_cache.get(group_id)
 
 
 def set_group_langs_cache(group_id, langs):
     """設定群組語言設定快取"""
+    if shared_group_langs_cache is not None:
+        shared_group_langs_cache.set(group_id, json.dumps(sorted(langs)))
+        return
     group_langs_cache.set(group_id, langs)
 
 
 def invalidate_group_langs_cache(group_id):
     """刪除群組語言設定快取（用於更新時）"""
-    group_langs_cache.cache.pop(group_id, None)
-    group_langs_cache.timestamps.pop(group_id, None)
+    if shared_group_langs_cache is not None:
+        shared_group_langs_cache.delete(group_id)
+        return
+    group_langs_cache.delete(group_id)
+
+
+def get_menu_cache(group_id):
+    """取得語言選單快取"""
+    if shared_menu_cache is not None:
+        raw = shared_menu_cache.get(group_id)
+        return json.loads(raw) if raw is not None else None
+    return menu_cache.get(group_id)
+
+
+def set_menu_cache(group_id, menu):
+    """設定語言選單快取"""
+    if shared_menu_cache is not None:
+        shared_menu_cache.set(group_id, json.dumps(menu, ensure_ascii=False))
+        return
+    menu_cache.set(group_id, menu)
+
+
+def invalidate_menu_cache(group_id):
+    """刪除語言選單快取（語言設定變更時）"""
+    if shared_menu_cache is not None:
+        shared_menu_cache.delete(group_id)
+        return
+    menu_cache.delete(group_id)
+
+
+def get_tenant_cache(group_id):
+    """取得群組所屬租戶的快取"""
+    return tenant_cache.get(group_id)
+
+
+def set_tenant_cache(group_id, value):
+    """設定群組所屬租戶的快取"""
+    tenant_cache.set(group_id, value)
+
+
+def invalidate_tenant_cache(group_id):
+    """刪除群組所屬租戶的快取（群組加入租戶時）"""
+    tenant_cache.delete(group_id)
+
+
+def get_skip_rules_cache(group_id):
+    """取得群組略過翻譯規則的快取"""
+    return skip_rules_cache.get(group_id)
+
+
+def set_skip_rules_cache(group_id, rules):
+    """設定群組略過翻譯規則的快取"""
+    skip_rules_cache.set(group_id, rules)
+
+
+def invalidate_skip_rules_cache(group_id):
+    """刪除群組略過翻譯規則的快取（規則變更時）"""
+    skip_rules_cache.delete(group_id)
+
+
+def get_engine_pref_cache(group_id):
+    """取得群組翻譯引擎偏好的快取（沒有偏好時為空字串）"""
+    return engine_pref_cache.get(group_id)
+
+
+def set_engine_pref_cache(group_id, engine):
+    """設定群組翻譯引擎偏好的快取"""
+    engine_pref_cache.set(group_id, engine)
+
+
+def invalidate_engine_pref_cache(group_id):
+    """刪除群組翻譯引擎偏好的快取（偏好變更時）"""
+    engine_pref_cache.delete(group_id)
+
+
+def get_translation_hit_rate_by_lang():
+    """取得翻譯快取各目標語言的命中率"""
+    by_lang = {}
+    for (lang, kind), count in translation_lang_counters.snapshot().items():
+        by_lang.setdefault(lang, {"hits": 0, "misses": 0})[kind] = count
+    for counts in by_lang.values():
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else 0.0
+    return by_lang
 
 
 def get_cache_stats():
     """取得快取統計"""
     return {
+        "backend": config.CACHE_BACKEND,
+        "translation_cache_policy": translation_cache.policy,
         "translation_cache_size": translation_cache.size(),
+        "translation_cache_bytes": translation_cache.memory_bytes(),
         "group_langs_cache_size": group_langs_cache.size(),
+        "group_langs_cache_bytes": group_langs_cache.memory_bytes(),
+        "menu_cache_size": menu_cache.size(),
+        "menu_cache_bytes": menu_cache.memory_bytes(),
         "tenant_cache_size": tenant_cache.size(),
+        "tenant_cache_bytes": tenant_cache.memory_bytes(),
+        "skip_rules_cache_size": skip_rules_cache.size(),
+        "skip_rules_cache_bytes": skip_rules_cache.memory_bytes(),
+        "engine_pref_cache_size": engine_pref_cache.size(),
+        "engine_pref_cache_bytes": engine_pref_cache.memory_bytes(),
+        "persistent_cache": persistent_cache.stats() if persistent_cache is not None else None,
+        "counters": {
+            "translation": translation_cache.stats(),
+            "group_langs": group_langs_cache.stats(),
+            "menu": menu_cache.stats(),
+            "tenant": tenant_cache.stats(),
+            "skip_rules": skip_rules_cache.stats(),
+            "engine_pref": engine_pref_cache.stats(),
+        },
+        "translation_by_lang": get_translation_hit_rate_by_lang(),
+        "translation_partitions": translation_quota.stats(),
     }
@@ -0,0 +1,182 @@
+"""
+Circuit breaker module - 翻譯引擎斷路器
+引擎在滾動時間窗內錯誤率或慢呼叫比例過高時斷開（open），之後直接略過不再等逾時；
+背景執行緒定期探測，恢復後先放少量請求試行（half-open），成功才完全恢復（closed）
+"""
+import os
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """單一引擎的斷路器"""
+
+    def __init__(self, name, window=60, min_calls=10, error_rate=0.5, slow_call=2.5, slow_rate=0.8,
+                 open_seconds=30, half_open_calls=3, probe=None):
+        """
+        Args:
+            name: 引擎名稱
+            window: 滾動時間窗（秒）
+            min_calls: 時間窗內至少要有幾次呼叫才判斷
+            error_rate: 錯誤率達到此值時斷開
+            slow_call: 超過此秒數視為慢呼叫
+            slow_rate: 慢呼叫比例達到此值時斷開
+            open_seconds: 斷開後多久開始探測
+            half_open_calls: 試行期間放行的請求數（全部成功才恢復）
+            probe: 探測函數，回傳 True 表示引擎已恢復；None 時直接進入試行
+        """
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.probe = probe
+
+        self._lock = threading.Lock()
+        self._calls = deque()  # (timestamp, ok, latency)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_started = 0  # 試行期間已放行的請求數
+        self._trial_succeeded = 0
+        self._half_opened_at = 0.0
+        self._prober_pid = None  # 探測執行緒所屬的行程（fork 後重新啟動）
+
+        # 統計
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+
+    def allow(self):
+        """是否放行這次請求（open 時直接拒絕）"""
+        with self._lock:
+            if self._state == OPEN and self.probe is None \
+                    and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN:
+                # 試行請求沒有回報結果（例如不支援的語言）時，過一段時間重新放行
+                if time.monotonic() - self._half_opened_at >= self.open_seconds:
+                    self._half_open()
+                if self._trial_started < self.half_open_calls:
+                    self._trial_started += 1
+                    return True
+            self.rejected += 1
+            need_prober = self._state == OPEN and self.probe is not None and self._prober_pid != os.getpid()
+        if need_prober:
+            self._start_prober()
+        return False
+
+    def record(self, ok, latency):
+        """記錄一次呼叫結果（latency 為秒）"""
+        now = time.monotonic()
+        opened = False
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if not ok:
+                    print(f"🔌 [斷路器] {self.name} 試行失敗，再次斷開")
+                    self._open(now)
+                    opened = True
+                else:
+                    self._trial_succeeded += 1
+                    if self._trial_succeeded >= self.half_open_calls:
+                        self._state = CLOSED
+                        print(f"✅ [斷路器] {self.name} 已恢復")
+            elif self._state == CLOSED:
+                opened = self._observe(now, ok, latency)
+        if opened and self.probe is not None:
+            self._start_prober()
+
+    def _observe(self, now, ok, latency):
+        """closed 狀態下記錄呼叫並判斷是否斷開（需持有 lock），斷開時回傳 True"""
+        self._calls.append((now, ok, latency))
+        self._prune(now)
+        total = len(self._calls)
+        if total < self.min_calls:
+            return False
+        errors = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+        slow = sum(1 for _, _, call_latency in self._calls if call_latency >= self.slow_call)
+        if errors / total >= self.error_rate or slow / total >= self.slow_rate:
+            print(f"🔌 [斷路器] {self.name} 斷開（{total} 次呼叫，錯誤 {errors}，慢呼叫 {slow}）")
+            self._open(now)
+            return True
+        return False
+
+    def _prune(self, now):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _open(self, now):
+        """切換到 open（需持有 lock）"""
+        self._state = OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self.opened += 1
+
+    def _half_open(self):
+        """切換到 half-open（需持有 lock）"""
+        self._state = HALF_OPEN
+        self._half_opened_at = time.monotonic()
+        self._trial_started = 0
+        self._trial_succeeded = 0
+
+    def _start_prober(self):
+        """open 時啟動背景探測執行緒（每個行程最多一個）"""
+        with self._lock:
+            if self._state != OPEN or self._prober_pid == os.getpid():
+                return
+            self._prober_pid = os.getpid()
+        threading.Thread(target=self._probe_loop, name=f'{self.name}-probe', daemon=True).start()
+
+    def _probe_loop(self):
+        """每 open_seconds 探測一次，成功後進入 half-open"""
+        try:
+            while True:
+                time.sleep(self.open_seconds)
+                self.probes += 1
+                try:
+                    healthy = self.probe()
+                except Exception as e:
+                    print(f"⚠️ [斷路器] {self.name} 探測失敗: {type(e).__name__}: {e}")
+                    healthy = False
+                if healthy:
+                    with self._lock:
+                        if self._state == OPEN:
+                            self._half_open()
+                    print(f"🔍 [斷路器] {self.name} 探測成功，進入試行")
+                    return
+        finally:
+            with self._lock:
+                self._prober_pid = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def stats(self):
+        """取得斷路器狀態與時間窗內的錯誤率 / 慢呼叫比例"""
+        with self._lock:
+            self._prune(time.monotonic())
+            total = len(self._calls)
+            errors = sum(1 for _, ok, _ in self._calls if not ok)
+            slow = sum(1 for _, _, latency in self._calls if latency >= self.slow_call)
+            avg_latency = sum(latency for _, _, latency in self._calls) / total if total else 0.0
+            return {
+                "state": self._state,
+                "window_calls": total,
+                "error_rate": round(errors / total, 3) if total else 0.0,
+                "slow_rate": round(slow / total, 3) if total else 0.0,
+                "avg_latency_ms": round(avg_latency * 1000, 1),
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "probes": self.probes,
+            }
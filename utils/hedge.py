@@ -0,0 +1,52 @@
+"""
+Hedge module - 對沖請求的預算控制
+每個可對沖的請求累積 ratio 個 token，送出一次對沖請求消耗 1 個，
+因此對沖請求最多佔流量的 ratio（短時間爆量最多用掉累積的 burst 個）
+"""
+import threading
+
+
+class HedgeBudget:
+    """對沖請求預算"""
+
+    def __init__(self, ratio=0.1, burst=10):
+        """
+        Args:
+            ratio: 對沖請求最多佔請求數的比例
+            burst: token 累積上限
+        """
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+        # 統計
+        self.requests = 0
+        self.hedged = 0
+        self.exhausted = 0
+
+    def on_request(self):
+        """每個可對沖的請求呼叫一次"""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self):
+        """嘗試取得一次對沖額度"""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.hedged += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def stats(self):
+        """取得對沖統計"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "budget_exhausted": self.exhausted,
+                "hedge_ratio": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+            }
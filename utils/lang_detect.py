@@ -0,0 +1,118 @@
+"""
+Language detection module - 以 Unicode 文字區段判斷訊息語言（不需外部套件）
+用於略過與原文相同的目標語言，並把來源語言明確傳給翻譯引擎
+"""
+import re
+import unicodedata
+
+import config
+
+# 各文字系統的字元範圍（依判斷順序）
+_SCRIPT_PATTERNS = (
+    ('kana', re.compile(r'[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]')),
+    ('hangul', re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]')),
+    ('han', re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')),
+    ('thai', re.compile(r'[\u0e00-\u0e7f]')),
+    ('myanmar', re.compile(r'[\u1000-\u109f\ua9e0-\ua9ff\uaa60-\uaa7f]')),
+    ('cyrillic', re.compile(r'[\u0400-\u04ff]')),
+    ('latin', re.compile(r'[A-Za-z\u00c0-\u024f\u1e00-\u1eff]')),
+)
+
+# 單一文字系統對應的語言
+_SCRIPT_LANGS = {
+    'hangul': 'ko',
+    'thai': 'th',
+    'myanmar': 'my',
+    'cyrillic': 'ru',
+}
+
+# 越南文特有的字母（含聲調的母音集中在 U+1EA0-U+1EF9）
+_VIETNAMESE_RE = re.compile(r'[\u0103\u00e2\u0111\u00ea\u00f4\u01a1\u01b0\u0102\u00c2\u0110\u00ca\u00d4\u01a0\u01af\u1ea0-\u1ef9]')
+_VIETNAMESE_MIN_RATIO = 0.1  # 拉丁字母中越南文字母的最低比例
+
+# 假名佔漢字 + 假名的最低比例（中文訊息偶爾會夾一個「の」）
+_KANA_MIN_RATIO = 0.2
+
+# 簡體 / 繁體獨有的常用字，用來區分 zh-CN 與 zh-TW
+_SIMPLIFIED_ONLY = frozenset(
+    '这个们来说时会对国过还没发现经问题为么样开关门见东车马鸟鱼书买卖页学习读写语话请让认识记设计讲谢'
+    '员务动办处华单准备图场坏块报声变头实宝导层岁带帮广应张弹录总战户护择换数无旧显条极杂权桥汉爱热'
+    '灯点烦猪环电画疗监盘码础离种称稳穷笔简粮约纪级红纯线练组细终结给统继续网罗义职联脑艺节药获虑虽'
+    '蓝补观规视览觉订讨训议许论访证评诉词译试诗该详误诸课谁调谈谊贝负贡财责贤败货质贩购贵费贸资赛赶'
+    '赵转轮软轻较辅辆输边达迟运进远连选递邮钟钱铁银锁锅错键闭闲间闻阅队阳阶际陆陈险随隐难雾静韩顶项'
+    '顺须顾顿预领频题颜风飞饭饮饱馆驾验骑鲜鸡鸭麦黄齐龙'
+)
+_TRADITIONAL_ONLY = frozenset(
+    '這個們來說時會對國過還沒發現經問題為麼樣開關門見東車馬鳥魚書買賣頁學習讀寫語話請讓認識記設計講謝'
+    '員務動辦處華單準備圖場壞塊報聲變頭實寶導層歲帶幫廣應張彈錄總戰戶護擇換數無舊顯條極雜權橋漢愛熱'
+    '燈點煩豬環電畫療監盤碼礎離種稱穩窮筆簡糧約紀級紅純線練組細終結給統繼續網羅義職聯腦藝節藥獲慮雖'
+    '藍補觀規視覽覺訂討訓議許論訪證評訴詞譯試詩該詳誤諸課誰調談誼貝負貢財責賢敗貨質販購貴費貿資賽趕'
+    '趙轉輪軟輕較輔輛輸邊達遲運進遠連選遞郵鐘錢鐵銀鎖鍋錯鍵閉閒間聞閱隊陽階際陸陳險隨隱難霧靜韓頂項'
+    '順須顧頓預領頻題顏風飛飯飲飽館駕驗騎鮮雞鴨麥黃齊龍'
+)
+
+# 拉丁字母語言以常見虛詞區分英文 / 印尼文
+_WORD_RE = re.compile(r'[a-z]+')
+_ENGLISH_WORDS = frozenset(
+    'the and is are was you to of it this that what have has will can not with for my your do does'.split()
+)
+_INDONESIAN_WORDS = frozenset(
+    'yang dan di ini itu tidak saya ada untuk dengan apa kamu sudah akan bisa aku dia mau belum juga'.split()
+)
+
+
+def detect_language(text):
+    """
+    判斷訊息的語言
+
+    Args:
+        text: 訊息文字
+
+    Returns:
+        語言代碼（與 LANGUAGE_MAP 相同，另有 zh-CN），無法判斷或混合多種語言時為 None
+    """
+    if not text:
+        return None
+    text = unicodedata.normalize('NFC', text)
+
+    counts = {name: len(pattern.findall(text)) for name, pattern in _SCRIPT_PATTERNS}
+    letters = sum(counts.values())
+    if not letters:
+        return None
+
+    # 日文：漢字與假名混用
+    kana, han = counts['kana'], counts['han']
+    if kana and kana / (kana + han) >= _KANA_MIN_RATIO:
+        return 'ja' if (kana + han) / letters >= config.LANG_DETECT_MIN_RATIO else None
+
+    script = max(counts, key=counts.get)
+    if counts[script] / letters < config.LANG_DETECT_MIN_RATIO:
+        return None
+
+    if script == 'han':
+        return _detect_chinese_variant(text)
+    if script == 'latin':
+        return _detect_latin_language(text, counts['latin'])
+    return _SCRIPT_LANGS.get(script)
+
+
+def _detect_chinese_variant(text):
+    """以簡繁獨有字的數量區分 zh-CN / zh-TW（都沒有時視為繁體）"""
+    simplified = sum(1 for ch in text if ch in _SIMPLIFIED_ONLY)
+    traditional = sum(1 for ch in text if ch in _TRADITIONAL_ONLY)
+    return 'zh-CN' if simplified > traditional else 'zh-TW'
+
+
+def _detect_latin_language(text, latin_count):
+    """拉丁字母：越南文看聲調字母，英文 / 印尼文看常見虛詞，無法區分時為 None"""
+    if len(_VIETNAMESE_RE.findall(text)) / latin_count >= _VIETNAMESE_MIN_RATIO:
+        return 'vi'
+
+    words = _WORD_RE.findall(text.lower())
+    english = sum(1 for word in words if word in _ENGLISH_WORDS)
+    indonesian = sum(1 for word in words if word in _INDONESIAN_WORDS)
+    if english > indonesian:
+        return 'en'
+    if indonesian > english:
+        return 'id'
+    return None
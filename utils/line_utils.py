@@ -1,6 +1,7 @@
 """
 LINE API utilities - LINE Bot 相關工具
 """
+import time
 from linebot.models import TextSendMessage, FlexSendMessage
 from linebot import LineBotApi
 import config
@@ -58,3 +59,27 @@ def create_reply_message(line_bot_api, token, message_content):
 def is_group_admin(user_id, group_id, data):
     """檢查用戶是否為群組管理員"""
     return data.get('group_admin', {}).get(group_id) == user_id
+
+
+def get_reply_deadline(event):
+    """
+    計算事件 reply token 的失效時間點
+    
+    Args:
+        event: LINE webhook 事件（dict），timestamp 為毫秒
+    
+    Returns:
+        reply_message 必須送出的時間點（time.time() 基準，已扣除 REPLY_DEADLINE_MARGIN）
+    """
+    now = time.time()
+    timestamp = event.get('timestamp')
+    # 事件時間不可能晚於收到時間，避免時鐘誤差讓期限變長
+    arrived_at = min(timestamp / 1000, now) if timestamp else now
+    return arrived_at + config.REPLY_TOKEN_TTL - config.REPLY_DEADLINE_MARGIN
+
+
+def remaining_budget(deadline, default):
+    """距離期限的剩餘秒數，最多為 default；未指定期限時回傳 default"""
+    if deadline is None:
+        return default
+    return max(0, min(default, deadline - time.time()))
@@ -0,0 +1,123 @@
+"""
+Message classifier module - 判斷訊息是否不需要翻譯
+純表情符號、貼圖文字、網址、@提及、笑聲（哈哈哈 / 555 / www）、標點與數字
+直接略過，不送翻譯引擎
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from utils.metrics import ThreadLocalCounters
+
+# 依回報優先順序排列的類別
+KINDS = ('url', 'mention', 'sticker', 'laughter', 'emoji', 'number', 'punctuation', 'custom')
+
+URL_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+# LINE 的提及後面會接空白；沒有空白時無法判斷名字在哪裡結束，不當成提及
+MENTION_RE = re.compile(r'@[^\s@]{1,20}(?=\s|$)')
+# LINE 表情貼的文字名稱是角色名稱加上一個表情（例如 (moon grin)、(brown)）；
+# 只比對已知角色，避免把一般的括號句子（例如 (meeting cancelled)）當成貼圖
+_LINE_EMOTICON_NAMES = ('moon', 'brown', 'cony', 'sally', 'james', 'boss', 'jessica', 'leonard', 'edward', 'choco')
+# LINE 以文字呈現的貼圖 / 媒體（例如 [貼圖]、(moon grin)）
+_STICKER_RE = re.compile(
+    r'\[(?:貼圖|贴图|sticker|照片|photo|影片|video)\]'
+    r'|\((?:' + '|'.join(_LINE_EMOTICON_NAMES) + r')(?: [a-z]+)?\)',
+    re.IGNORECASE,
+)
+_LAUGHTER_RE = re.compile(
+    r'(?:哈|呵|嘻|嘿){2,}'  # 中文
+    r'|5{3,}'  # 泰文（ห้า）
+    r'|[wｗ]{2,}'  # 日文
+    r'|[ㅋㅎ]{2,}'  # 韓文
+    r'|(?:ha|he|hi|ho){2,}h?|a?(?:ha){2,}|lo+l|lmao|xd+|k{3,}|(?:wk){2,}',
+    re.IGNORECASE,
+)
+
+_counters = ThreadLocalCounters()
+
+
+@lru_cache(maxsize=256)
+def _compile_custom(patterns):
+    """群組自訂規則合併成一個正則（同一組規則只編譯一次）"""
+    try:
+        return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+    except re.error as e:
+        print(f"⚠️ 群組自訂略過規則無效: {e}")
+        return None
+
+
+def classify(text, rules=None):
+    """
+    判斷訊息是否不需要翻譯
+
+    Args:
+        text: 訊息文字
+        rules: 群組規則 {"disabled": [類別...], "patterns": [正則...]}，None 表示使用預設
+
+    Returns:
+        不需翻譯時回傳類別（KINDS 之一），需要翻譯時為 None
+    """
+    text = text.strip() if text else ''
+    if not text:
+        return 'punctuation'
+
+    rules = rules or {}
+    disabled = rules.get('disabled') or ()
+    patterns = rules.get('patterns')
+    if patterns:
+        custom = _compile_custom(tuple(patterns))
+        if custom is not None and custom.fullmatch(text):
+            return 'custom'
+
+    found = set()
+    for kind, pattern in (('url', URL_RE), ('mention', MENTION_RE), ('sticker', _STICKER_RE)):
+        if kind in disabled:
+            continue
+        text, count = pattern.subn(' ', text)
+        if count:
+            found.add(kind)
+
+    for token in text.split():
+        core = ''.join(ch for ch in token if ch.isalnum())
+        if not core:
+            # 沒有文字：表情符號（符號類字元）或標點
+            found.add('emoji' if any(unicodedata.category(ch) == 'So' for ch in token) else 'punctuation')
+        elif _LAUGHTER_RE.fullmatch(core):
+            found.add('laughter')
+        elif core.isdigit():
+            found.add('number')
+        else:
+            return None
+
+    if found & set(disabled):  # 群組關閉的類別照常翻譯
+        return None
+    for kind in KINDS:
+        if kind in found:
+            return kind
+    return 'punctuation'
+
+
+def check_message(text, target_count=1, rules=None):
+    """
+    classify 並累計統計
+
+    Args:
+        text: 訊息文字
+        target_count: 目標語言數（略過時省下的上游呼叫次數）
+        rules: 群組規則
+
+    Returns:
+        不需翻譯時回傳類別，需要翻譯時為 None
+    """
+    kind = classify(text, rules)
+    _counters.incr('messages')
+    if kind is not None:
+        _counters.incr(kind)
+        _counters.incr('skipped_messages')
+        _counters.incr('calls_saved', target_count)
+    return kind
+
+
+def get_classifier_stats():
+    """取得略過統計（calls_saved 為省下的上游翻譯呼叫次數）"""
+    return _counters.snapshot()
@@ -0,0 +1,119 @@
+"""
+Metrics module - 低開銷計數器
+每個執行緒累加自己的計數（不需加鎖），讀取時再加總
+"""
+import math
+import threading
+from collections import defaultdict, deque
+
+
+class ThreadLocalCounters:
+    """以執行緒為單位累加、讀取時彙總的計數器"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all = []  # 所有執行緒的計數 dict
+        self._register_lock = threading.Lock()
+
+    def _counts(self):
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = defaultdict(int)
+            with self._register_lock:  # 每個執行緒只會註冊一次
+                self._all.append(counts)
+            self._local.counts = counts
+        return counts
+
+    def incr(self, name, amount=1):
+        """累加計數"""
+        self._counts()[name] += amount
+
+    def snapshot(self):
+        """取得所有執行緒加總後的計數"""
+        totals = defaultdict(int)
+        with self._register_lock:
+            all_counts = list(self._all)
+        for counts in all_counts:
+            for name, value in list(counts.items()):
+                totals[name] += value
+        return dict(totals)
+
+
+class LatencyWindow:
+    """最近 N 次延遲的滾動視窗，用來估計分位數（例如 p90）"""
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """記錄一次延遲（秒）"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self):
+        with self._lock:
+            return len(self._samples)
+
+    def quantile(self, q):
+        """取得分位數（秒），沒有樣本時為 None"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class LatencySketch:
+    """對數分桶的延遲直方圖：O(1) 記錄，每 decay_every 筆將計數減半，讓舊樣本逐漸淡出"""
+
+    def __init__(self, min_value=0.01, max_value=60.0, growth=1.1, decay_every=1000):
+        """
+        Args:
+            min_value: 最小分桶上限（秒）
+            max_value: 最大可區分的延遲（秒）
+            growth: 相鄰分桶上限的比例（誤差約 growth - 1）
+            decay_every: 每記錄幾筆減半一次
+        """
+        self.min_value = min_value
+        self.growth = growth
+        self.decay_every = decay_every
+        self._log_growth = math.log(growth)
+        self._counts = [0.0] * (int(math.log(max_value / min_value) / self._log_growth) + 2)
+        self._weight = 0.0  # 減半後的總計數
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, seconds):
+        if seconds <= self.min_value:
+            return 0
+        return min(len(self._counts) - 1, int(math.log(seconds / self.min_value) / self._log_growth) + 1)
+
+    def record(self, seconds):
+        """記錄一次延遲（秒）"""
+        bucket = self._bucket(seconds)
+        with self._lock:
+            self._counts[bucket] += 1
+            self._weight += 1
+            self._recorded += 1
+            if self._recorded % self.decay_every == 0:
+                self._counts = [count / 2 for count in self._counts]
+                self._weight /= 2
+
+    def weight(self):
+        """目前的有效樣本數（減半後）"""
+        with self._lock:
+            return self._weight
+
+    def quantile(self, q):
+        """取得分位數（秒，回傳所在分桶的上限），沒有樣本時為 None"""
+        with self._lock:
+            if not self._weight:
+                return None
+            target = q * self._weight
+            cumulative = 0.0
+            for bucket, count in enumerate(self._counts):
+                cumulative += count
+                if cumulative >= target and count:
+                    return self.min_value * self.growth ** bucket
+            return self.min_value * self.growth ** (len(self._counts) - 1)
@@ -0,0 +1,123 @@
+"""
+Micro-batcher module - 把短時間內同時送出的請求合併成批次
+尖峰時多個群組的訊息幾乎同時到達，合併後以一次批次請求送出；
+負載以相同 key 同時進行的請求數計算（同一則訊息分送多個語言時各 key 只有一筆，直接送出），
+不多時直接送出，不增加任何等待
+"""
+import threading
+from concurrent.futures import Future
+
+
+class _Batch:
+    """收集中的一個批次"""
+
+    def __init__(self):
+        self.items = []  # [(item, Future)]
+        self.full = threading.Event()
+
+
+class MicroBatcher:
+    """以 key 分組的微批次：第一個加入批次的呼叫者等待時間窗後負責送出整個批次"""
+
+    def __init__(self, name, dispatch, window=0.05, max_items=20, min_inflight=4):
+        """
+        Args:
+            name: 名稱（用於日誌）
+            dispatch: 批次處理函數，呼叫方式為 dispatch(key, items)，回傳與 items 對應的結果 list
+            window: 最長收集時間（秒），實際時間依相同 key 同時進行的請求數縮放
+            max_items: 批次筆數上限，達到時立即送出
+            min_inflight: 相同 key 同時進行的請求數超過此值才開始合併
+        """
+        self.name = name
+        self.dispatch = dispatch
+        self.window = window
+        self.max_items = max_items
+        self.min_inflight = min_inflight
+
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> _Batch
+        self._active = 0  # 目前在 submit 中的呼叫數
+        self._active_by_key = {}  # key -> 目前在 submit 中的呼叫數（負載指標）
+
+        # 統計
+        self.direct = 0
+        self.batches = 0
+        self.batched_items = 0
+
+    def submit(self, key, item):
+        """
+        送出一筆請求並等待結果
+
+        Args:
+            key: 分組用的 key（相同 key 的請求才會合併）
+            item: 請求內容
+
+        Returns:
+            dispatch 回傳的對應結果
+        """
+        future = None
+        leader = False
+        with self._lock:
+            self._active += 1
+            active = self._active_by_key.get(key, 0) + 1
+            self._active_by_key[key] = active
+            if active > self.min_inflight:
+                batch = self._pending.get(key)
+                if batch is None:
+                    batch = self._pending[key] = _Batch()
+                    leader = True
+                future = Future()
+                batch.items.append((item, future))
+                if len(batch.items) >= self.max_items:
+                    self._pending.pop(key, None)
+                    batch.full.set()
+            else:
+                self.direct += 1
+
+        try:
+            if future is None:  # 負載低，直接送出
+                return self.dispatch(key, [item])[0]
+            if leader:
+                # 相同 key 同時進行的請求越多，等待越久（最多 window 秒）
+                batch.full.wait(self.window * min(1.0, active / self.max_items))
+                with self._lock:
+                    if self._pending.get(key) is batch:
+                        self._pending.pop(key)
+                self._run(key, batch)
+            return future.result()
+        finally:
+            with self._lock:
+                self._active -= 1
+                remaining = self._active_by_key[key] - 1
+                if remaining:
+                    self._active_by_key[key] = remaining
+                else:
+                    del self._active_by_key[key]
+
+    def _run(self, key, batch):
+        """送出整個批次並設定每個呼叫者的結果"""
+        with self._lock:
+            items = list(batch.items)  # pop 之後不會再有人加入
+            self.batches += 1
+            self.batched_items += len(items)
+        try:
+            results = self.dispatch(key, [item for item, _ in items])
+        except Exception as e:
+            print(f"❌ [{self.name}] 批次處理失敗: {type(e).__name__}: {e}")
+            for _, future in items:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(items, results):
+            future.set_result(result)
+
+    def stats(self):
+        """取得批次統計"""
+        with self._lock:
+            return {
+                "active": self._active,
+                "active_keys": len(self._active_by_key),
+                "direct": self.direct,
+                "batches": self.batches,
+                "batched_items": self.batched_items,
+                "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            }
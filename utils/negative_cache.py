@@ -0,0 +1,126 @@
+"""
+Negative cache module - 記錄已知會失敗的翻譯組合，在 TTL 內直接略過
+例如引擎不支援的語言、某語言持續回傳無法解析的結果、某段文字每次都翻譯失敗；
+到期後若有探測函數則在背景重試，成功才移除，失敗則延長 TTL（不讓線上請求去試）
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class NegativeCache:
+    """以 key 記錄失敗，連續失敗達門檻後在 TTL 內視為封鎖"""
+
+    def __init__(self, name, ttl=60, max_ttl=900, threshold=1, max_size=1000, probe=None):
+        """
+        Args:
+            name: 名稱（用於日誌）
+            ttl: 封鎖時間（秒）
+            max_ttl: 背景重試仍失敗時 TTL 加倍的上限（秒）
+            threshold: 連續失敗幾次才封鎖
+            max_size: 最多記錄幾個 key（超過時淘汰最舊的）
+            probe: 背景重試函數，呼叫方式為 probe(key)，回傳 True 表示已恢復；None 時到期直接解除
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.threshold = threshold
+        self.max_size = max_size
+        self.probe = probe
+
+        self._lock = threading.Lock()
+        self._failures = OrderedDict()  # key -> 連續失敗次數（尚未封鎖）
+        self._blocked = OrderedDict()  # key -> [expires_at, ttl, retrying]
+
+        # 統計
+        self.hits = 0
+        self.added = 0
+        self.retries = 0
+        self.recovered = 0
+
+    def is_blocked(self, key):
+        """key 是否在封鎖中；到期時解除或啟動背景重試"""
+        with self._lock:
+            entry = self._blocked.get(key)
+            if entry is None:
+                return False
+            expires_at, ttl, retrying = entry
+            if retrying or time.monotonic() < expires_at:
+                self.hits += 1
+                return True
+            if self.probe is None:
+                del self._blocked[key]
+                return False
+            entry[2] = True  # 背景重試期間仍封鎖
+            self.hits += 1
+            self.retries += 1
+        threading.Thread(target=self._retry, args=(key,), name=f'{self.name}-retry', daemon=True).start()
+        return True
+
+    def record_failure(self, key, immediate=False):
+        """
+        記錄一次失敗
+
+        Args:
+            key: 失敗的組合
+            immediate: 是否不計次數直接封鎖（例如引擎明確回報不支援）
+        """
+        with self._lock:
+            if key in self._blocked:
+                return
+            count = self._failures.pop(key, 0) + 1
+            if not immediate and count < self.threshold:
+                self._failures[key] = count
+                while len(self._failures) > self.max_size:
+                    self._failures.popitem(last=False)
+                return
+            self._block(key, self.ttl)
+            self.added += 1
+        print(f"🚫 [{self.name}] 暫時略過 {key}（{self.ttl}s）")
+
+    def record_success(self, key):
+        """成功時清除連續失敗次數"""
+        if key in self._failures:  # 大多數呼叫都成功，先不取 lock 檢查
+            with self._lock:
+                self._failures.pop(key, None)
+
+    def _block(self, key, ttl):
+        """封鎖 key（需持有 lock）"""
+        self._blocked.pop(key, None)
+        self._blocked[key] = [time.monotonic() + ttl, ttl, False]
+        while len(self._blocked) > self.max_size:
+            self._blocked.popitem(last=False)
+
+    def _retry(self, key):
+        """背景重試：成功則解除封鎖，失敗則 TTL 加倍（不超過 max_ttl）"""
+        try:
+            recovered = self.probe(key)
+        except Exception as e:
+            print(f"⚠️ [{self.name}] {key} 背景重試失敗: {type(e).__name__}: {e}")
+            recovered = False
+        with self._lock:
+            entry = self._blocked.get(key)
+            if recovered:
+                self._blocked.pop(key, None)
+                self.recovered += 1
+            elif entry is not None:
+                self._block(key, min(entry[1] * 2, self.max_ttl))
+        if recovered:
+            print(f"✅ [{self.name}] {key} 已恢復")
+
+    def clear(self):
+        with self._lock:
+            self._failures.clear()
+            self._blocked.clear()
+
+    def stats(self):
+        """取得封鎖中的 key 數量與統計"""
+        with self._lock:
+            return {
+                "blocked": len(self._blocked),
+                "pending_failures": len(self._failures),
+                "hits": self.hits,
+                "added": self.added,
+                "retries": self.retries,
+                "recovered": self.recovered,
+            }
@@ -0,0 +1,222 @@
+"""
+Persistent cache module - 本機 SQLite 持久化快取（L2）
+放在記憶體 LRU 快取之下，讓快取內容在定時重啟後仍然存在；
+WAL 模式下同一台主機的多個 gunicorn worker 可共用同一個檔案
+"""
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteCache:
+    """以 SQLite 檔案實作的持久化快取：TTL 過期、筆數上限、批次寫入（write-behind）"""
+
+    def __init__(self, path, table='cache', ttl=86400, max_rows=50000, flush_interval=2, batch_size=100,
+                 write_behind=True, maintenance_interval=600):
+        """
+        Args:
+            path: SQLite 檔案路徑
+            table: 資料表名稱（同一檔案可放多個快取）
+            ttl: 過期時間（秒）
+            max_rows: 最多保留筆數，超過時刪除最舊的
+            flush_interval: 背景批次寫入間隔（秒）
+            batch_size: 待寫入筆數達到此值時立即寫入
+            write_behind: False 時每次 set 立即寫入（其他 worker 可立刻讀到）
+            maintenance_interval: 清除過期與超出上限資料的間隔（秒）
+        """
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.write_behind = write_behind
+        self.maintenance_interval = maintenance_interval
+        self._last_maintenance = time.monotonic()
+
+        self._local = threading.local()  # 每個執行緒各自的連線
+        self._pending = {}  # key -> (value, created_at)，尚未寫入的資料
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._flusher = None
+        self._flusher_pid = None
+        self._start_lock = threading.Lock()
+
+        # 統計
+        self.hits = 0
+        self.misses = 0
+        self.flushed = 0
+        self.rows = 0
+
+        self._init_db()
+
+    def _conn(self):
+        """取得目前執行緒的連線（fork 後的子行程會重新連線）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")  # 讀寫可同時進行，多行程共用
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        """建立資料表"""
+        try:
+            conn = self._conn()
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_created_at ON {self.table} (created_at)")
+            conn.commit()
+            self.rows = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            print(f"✅ 持久化快取已載入 {self.path}:{self.table}（{self.rows} 筆）")
+        except sqlite3.Error as e:
+            print(f"❌ 初始化持久化快取失敗: {type(e).__name__}: {e}")
+
+    def _start_flusher(self):
+        """啟動背景批次寫入執行緒（第一次 set 時自動呼叫，fork 後的子行程會重新啟動）"""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name=f'{self.table}-flush', daemon=True)
+            self._flusher.start()
+            self._flusher_pid = os.getpid()
+
+    def get(self, key):
+        """取得快取值，若不存在或過期返回 None"""
+        with self._pending_lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return pending[0]
+
+        try:
+            row = self._conn().execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"❌ 讀取持久化快取失敗: {type(e).__name__}: {e}")
+            return None
+
+        if row is None or time.time() - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key, value):
+        """設定快取值（write-behind 時先放入待寫入區，由背景執行緒批次寫入）"""
+        if not self.write_behind:
+            try:
+                conn = self._conn()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"❌ 寫入持久化快取失敗: {type(e).__name__}: {e}")
+            self._maybe_maintain()
+            return
+
+        self._start_flusher()
+        with self._pending_lock:
+            self._pending[key] = (value, time.time())
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._flush_event.set()
+
+    def flush(self):
+        """將待寫入資料批次寫入（沒有待寫入資料時不碰資料庫），並定期清除過期與超出上限的資料"""
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+
+            if batch:
+                try:
+                    conn = self._conn()
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                        [(k, v, t) for k, (v, t) in batch.items()],
+                    )
+                    conn.commit()
+                    self.flushed += len(batch)
+                    self.rows = min(self.rows + len(batch), self.max_rows)  # 估計值（覆寫既有 key 時偏高），清理時校正
+                except sqlite3.Error as e:
+                    print(f"❌ 寫入持久化快取失敗: {type(e).__name__}: {e}")
+        self._maybe_maintain()
+
+    def _maybe_maintain(self):
+        """距離上次清理超過 maintenance_interval 時清除過期與超出上限的資料"""
+        if time.monotonic() - self._last_maintenance < self.maintenance_interval:
+            return
+        with self._flush_lock:
+            if time.monotonic() - self._last_maintenance < self.maintenance_interval:
+                return
+            self._last_maintenance = time.monotonic()
+            try:
+                conn = self._conn()
+                conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl,))
+                rows = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+                if rows > self.max_rows:
+                    conn.execute(
+                        f"DELETE FROM {self.table} WHERE key IN"
+                        f" (SELECT key FROM {self.table} ORDER BY created_at LIMIT ?)",
+                        (rows - self.max_rows,),
+                    )
+                    rows = self.max_rows
+                conn.commit()
+                self.rows = rows
+            except sqlite3.Error as e:
+                print(f"❌ 清理持久化快取失敗: {type(e).__name__}: {e}")
+
+    def _flush_loop(self):
+        """背景批次寫入迴圈"""
+        while True:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+
+    def delete(self, key):
+        """刪除單筆快取（立即生效）"""
+        with self._pending_lock:
+            self._pending.pop(key, None)
+        try:
+            conn = self._conn()
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"❌ 刪除持久化快取失敗: {type(e).__name__}: {e}")
+
+    def clear(self):
+        """清空快取"""
+        with self._pending_lock:
+            self._pending.clear()
+        try:
+            conn = self._conn()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+            self.rows = 0
+        except sqlite3.Error as e:
+            print(f"❌ 清空持久化快取失敗: {type(e).__name__}: {e}")
+
+    def stats(self):
+        """取得快取統計"""
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            "rows": self.rows,
+            "pending_writes": pending,
+            "flushed": self.flushed,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,97 @@
+"""
+Rate limiter module - 翻譯引擎的用戶端 token bucket 限流
+同一個行程的所有執行緒共用；收到 429 時暫時降低速率，冷卻後再逐步恢復
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """可依 429 回饋自動降速的 token bucket"""
+
+    def __init__(self, name, rate, burst, backoff=0.5, min_rate=0.5, cooldown=30, recovery=60):
+        """
+        Args:
+            name: 引擎名稱
+            rate: 每秒可送出的請求數
+            burst: 可累積的 token 上限
+            backoff: 收到 429 時速率乘上的比例
+            min_rate: 速率下限
+            cooldown: 收到 429 後多久開始恢復（秒）
+            recovery: 從下限恢復到原本速率所需的時間（秒）
+        """
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.backoff = backoff
+        self.min_rate = min_rate
+        self.cooldown = cooldown
+        self.recovery = recovery
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = threading.Lock()
+
+        # 統計
+        self.allowed = 0
+        self.waited = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    def _refill(self, now):
+        """補充 token，冷卻期過後逐步恢復速率（需持有 lock）"""
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rate < self.base_rate and now >= self._penalty_until:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * elapsed / self.recovery)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def acquire(self, max_wait=0.0):
+        """
+        取得一個 token；不足時若能在 max_wait 秒內補到就預約並等待
+
+        Returns:
+            True 表示可以送出，False 表示超出預算
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.allowed += 1
+                return True
+            wait = (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                self.rejected += 1
+                return False
+            self._tokens -= 1  # 預約：之後補充的 token 先還這一個
+            self.allowed += 1
+            self.waited += 1
+        time.sleep(wait)
+        return True
+
+    def penalize(self):
+        """收到 429：降低速率並清空累積的 token"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            self._tokens = min(self._tokens, 0.0)
+            self._penalty_until = now + self.cooldown
+            self.throttled += 1
+        print(f"🐢 [限流] {self.name} 收到 429，速率降為 {self.rate:.2f}/s")
+
+    def stats(self):
+        """取得限流統計"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": round(self.rate, 2),
+                "base_rate": self.base_rate,
+                "tokens": round(self._tokens, 2),
+                "allowed": self.allowed,
+                "waited": self.waited,
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+            }
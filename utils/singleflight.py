@@ -0,0 +1,79 @@
+"""
+Single-flight module - 合併同時進行的相同請求
+同一個 key 同時只會有一個實際執行，其他呼叫者等待並共用結果
+"""
+import threading
+
+
+class _Call:
+    """一次進行中的呼叫"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """以 key 合併進行中的呼叫"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+
+        # 統計
+        self.calls = 0  # 總呼叫次數
+        self.executed = 0  # 實際執行次數
+        self.shared = 0  # 共用他人結果的次數
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        執行 func，若相同 key 已有進行中的呼叫則等待並共用其結果
+
+        Args:
+            key: 合併用的 key（須可 hash）
+            func: 要執行的函數
+            *args, **kwargs: 傳給 func 的參數
+
+        Returns:
+            (result, shared) 其中 shared 表示結果是否來自其他呼叫者的執行
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+    def stats(self):
+        """取得合併統計（dedup_ratio = 共用次數 / 總呼叫次數）"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream_calls": self.executed,
+                "coalesced": self.shared,
+                "in_flight": len(self._calls),
+                "dedup_ratio": round(self.shared / self.calls, 3) if self.calls else 0.0,
+            }
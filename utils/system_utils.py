@@ -58,7 +58,8 @@ def keep_alive(app):
             
             if current_time - last_restart >= config.AUTO_RESTART_INTERVAL:
                 print("⏰ 執行定時重啟...")
-                from utils.file_utils import load_json, save_json
+                from utils.cache import flush_persistent_cache
+                flush_persistent_cache()  # os._exit 不會執行 atexit，先寫入快取
                 os._exit(0)
 
             response = requests.get('http://0.0.0.0:5000/', timeout=10)
@@ -0,0 +1,99 @@
+"""
+Text chunker module - 將過長的文字依句子邊界切成不超過上限的區塊
+翻譯引擎對單一請求的長度有限制（Google 的 GET 還受 URL 長度限制），
+長訊息切塊後可並行翻譯，再依原本的分隔符組回
+"""
+import re
+
+# 在句尾標點之後或換行處切開，保留空白 / 換行作為分隔符
+_SENTENCE_END_RE = re.compile(r'((?<=[。！？!?.；;])\s*|\s*\n\s*)')
+
+
+def _hard_split(sentence, limit):
+    """單一句子超過上限時強制切開（優先在空白處），回傳 [(piece, separator), ...]"""
+    pieces = []
+    while len(sentence) > limit:
+        cut = sentence.rfind(' ', limit // 2, limit)
+        if cut > 0:
+            pieces.append((sentence[:cut], ' '))
+            sentence = sentence[cut + 1:]
+        else:
+            pieces.append((sentence[:limit], ''))
+            sentence = sentence[limit:]
+    pieces.append((sentence, ''))
+    return pieces
+
+
+def chunk_text(text, limit):
+    """
+    將文字切成每塊不超過 limit 個字元的區塊（盡量在句子邊界切開）
+
+    Args:
+        text: 文字
+        limit: 每塊的字元上限
+
+    Returns:
+        (chunks, separators)，separators[i] 接在 chunks[i] 之後，可用 join_chunks 組回
+    """
+    if len(text) <= limit:
+        return [text], ['']
+
+    parts = _SENTENCE_END_RE.split(text)
+    units = []  # (piece, separator_after)
+    prefix = ''  # 開頭的空白 / 換行，組回時接在第一塊之前
+    for sentence, sep in zip(parts[0::2], parts[1::2] + ['']):
+        if not sentence:  # 開頭的空白或連續的分隔符
+            if units:
+                units[-1] = (units[-1][0], units[-1][1] + sep)
+            else:
+                prefix += sep
+            continue
+        pieces = _hard_split(sentence, limit)
+        units.extend(pieces[:-1])
+        units.append((pieces[-1][0], sep))
+
+    chunks, separators = [], []
+    current, current_sep = '', ''
+    for piece, sep in units:
+        if current and len(current) + len(current_sep) + len(piece) > limit:
+            chunks.append(current)
+            separators.append(current_sep)
+            current = piece
+        else:
+            current = f"{current}{current_sep}{piece}" if current else piece
+        current_sep = sep
+    chunks.append(current)
+    separators.append(current_sep)
+    chunks[0] = prefix + chunks[0]
+    return chunks, separators
+
+
+def join_chunks(chunks, separators):
+    """依分隔符組回切塊（chunks 可以是翻譯後的結果）"""
+    return ''.join(f"{chunk}{separator}" for chunk, separator in zip(chunks, separators))
+
+
+def joined_size(texts, joiner_len=1):
+    """多段文字以 joiner 合併後的長度（n 段之間有 n - 1 個 joiner）"""
+    return sum(len(text) for text in texts) + joiner_len * max(len(texts) - 1, 0)
+
+
+def group_by_size(texts, limit, joiner_len=1):
+    """
+    將多段文字依序分組，每組合併後（含 joiner，大小同 joined_size）不超過 limit
+
+    Returns:
+        [[(index, text), ...], ...]；單段超過 limit 的自成一組
+    """
+    groups, current, size = [], [], 0
+    for index, text in enumerate(texts):
+        added = len(text) + (joiner_len if current else 0)
+        if current and size + added > limit:
+            groups.append(current)
+            current, size = [], 0
+            added = len(text)
+        current.append((index, text))
+        size += added
+    if current:
+        groups.append(current)
+    return groups
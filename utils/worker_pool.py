@@ -0,0 +1,154 @@
+"""
+Worker pool - 長駐工作執行緒池
+以固定數量的工作執行緒 + 有上限的佇列，取代「每則訊息開一條執行緒」
+佇列依期限排序（最早到期優先），無法在期限內完成的工作在執行前就丟棄
+"""
+import functools
+import inspect
+import itertools
+import queue
+import threading
+import time
+import config
+
+
+@functools.lru_cache(maxsize=64)
+def _accepts_deadline(func):
+    """func 是否有 deadline 參數（或 **kwargs）"""
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    return 'deadline' in params or any(p.kind is p.VAR_KEYWORD for p in params.values())
+
+
+class WorkerPool:
+    """固定數量的長駐工作執行緒，從有上限的佇列依期限先後（EDF）取出工作執行"""
+
+    def __init__(self, name, num_workers=4, queue_size=200, max_wait=20, min_budget=0):
+        """
+        Args:
+            name: 執行緒名稱前綴（用於日誌）
+            num_workers: 工作執行緒數量
+            queue_size: 佇列上限（超過時拒絕新工作）
+            max_wait: 未指定期限的工作，在佇列中最多等待秒數
+            min_budget: 開始執行時距離期限至少需要的秒數，不足則丟棄
+        """
+        self.name = name
+        self.num_workers = num_workers
+        self.max_wait = max_wait
+        self.min_budget = min_budget
+        self.queue = queue.PriorityQueue(maxsize=queue_size)
+        self._seq = itertools.count()  # 同期限時維持先進先出
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        # 統計
+        self.submitted = 0
+        self.dequeued = 0
+        self.completed = 0
+        self.rejected = 0  # 佇列已滿而拒絕
+        self.dropped_deadline = 0  # 已無法在期限內完成而丟棄
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    def start(self):
+        """啟動工作執行緒（第一次 submit 時自動呼叫）"""
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.num_workers):
+                t = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            print(f"✅ [{self.name}] 已啟動 {self.num_workers} 個工作執行緒")
+
+    def submit(self, func, *args, deadline=None, on_expired=None, **kwargs):
+        """
+        將工作排入佇列。
+
+        Args:
+            func: 要執行的函數
+            *args, **kwargs: 傳給 func 的參數
+            deadline: 工作必須完成的時間點（time.time()），預設為現在 + max_wait；
+                func 有 deadline 參數時也會以 deadline= 傳給 func（用來縮短自己的期限）
+            on_expired: 工作因期限不足被丟棄時呼叫的函數（例如回覆忙碌訊息）
+
+        Returns:
+            True 表示已排入佇列；False 表示佇列已滿
+        """
+        self.start()
+        now = time.time()
+        if deadline is None:
+            deadline = now + self.max_wait
+        if 'deadline' not in kwargs and _accepts_deadline(func):
+            kwargs['deadline'] = deadline
+        job = (deadline, next(self._seq), now, func, args, kwargs, on_expired)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            print(f"⚠️ [{self.name}] 佇列已滿 ({self.queue.maxsize})，拒絕新工作")
+            return False
+
+        with self._stats_lock:
+            self.submitted += 1
+        return True
+
+    def _worker(self):
+        """工作執行緒主迴圈"""
+        while True:
+            deadline, _, enqueued_at, func, args, kwargs, on_expired = self.queue.get()
+            now = time.time()
+            waited = now - enqueued_at
+            with self._stats_lock:
+                self.dequeued += 1
+                self.total_wait += waited
+                self.max_wait_seen = max(self.max_wait_seen, waited)
+
+            try:
+                if deadline - now < self.min_budget:
+                    with self._stats_lock:
+                        self.dropped_deadline += 1
+                    print(f"⚠️ [{self.name}] 工作等待 {waited:.1f}s 後已來不及在期限內完成，放棄執行")
+                    if on_expired:
+                        on_expired()
+                    continue
+
+                func(*args, **kwargs)
+                with self._stats_lock:
+                    self.completed += 1
+            except Exception as e:
+                print(f"❌ [{self.name}] 工作執行失敗: {type(e).__name__}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def stats(self):
+        """取得佇列深度、等待時間等統計"""
+        with self._stats_lock:
+            avg_wait = self.total_wait / self.dequeued if self.dequeued else 0.0
+            return {
+                "workers": self.num_workers,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "dropped_deadline": self.dropped_deadline,
+                "avg_wait_ms": round(avg_wait * 1000, 1),
+                "max_wait_ms": round(self.max_wait_seen * 1000, 1),
+            }
+
+
+# 翻譯工作池
+translation_pool = WorkerPool(
+    'translate-worker',
+    num_workers=config.TRANSLATION_WORKERS,
+    queue_size=config.TRANSLATION_QUEUE_SIZE,
+    max_wait=config.TRANSLATION_QUEUE_MAX_WAIT,
+    min_budget=config.MIN_TRANSLATION_BUDGET,
+)